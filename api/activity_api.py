@@ -1,6 +1,6 @@
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 from requests import Response
-from api.base_api import BaseAPI
+from api.base_api import AsyncBaseAPI, BaseAPI
 import allure
 
 
@@ -17,6 +17,15 @@ class ActivityAPI(BaseAPI):
     def get_activity_list(self, params: Optional[Dict] = None) -> Response:
         return self.get("/api/v1/activities", params=params)
     
+    def iter_activities(
+        self,
+        filters: Optional[Dict] = None,
+        page_size: int = 100,
+        prefetch: int = 2,
+        max_items: Optional[int] = None,
+    ) -> Iterator[Dict]:
+        return self.iter_pages(self.get_activity_list, filters, page_size, prefetch, max_items)
+    
     @allure.step("参与活动")
     def participate_activity(self, activity_id: int, user_id: int) -> Response:
         payload = {
@@ -48,3 +57,7 @@ class ActivityAPI(BaseAPI):
     def get_user_activities(self, user_id: int) -> Response:
         params = {"user_id": user_id}
         return self.get("/api/v1/activities/user", params=params)
+
+
+class AsyncActivityAPI(AsyncBaseAPI, ActivityAPI):
+    pass
@@ -1,6 +1,6 @@
 from typing import Dict
 from requests import Response
-from api.base_api import BaseAPI
+from api.base_api import AsyncBaseAPI, BaseAPI
 import allure
 
 
@@ -39,3 +39,7 @@ class AuthAPI(BaseAPI):
             "new_password": new_password
         }
         return self.post("/api/v1/auth/change-password", json=payload)
+
+
+class AsyncAuthAPI(AsyncBaseAPI, AuthAPI):
+    pass
@@ -1,16 +1,42 @@
-from typing import Optional, Dict
+import functools
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+import allure
 from requests import Response
-from core.http_client import HttpClient
+from core.async_http_client import AsyncHttpClient
+from core.http_client import HttpClient, execute_concurrently
 from core.logger import log
+from core.pagination import PageIterator
+from core.response_cache import ResponseCache
 from config.settings import settings
 
 
+@dataclass
+class CallResult:
+    """
+    BaseAPI.gather 中单个接口方法调用的结果，以方法名和参数标识
+    一次调用内部可能发出多个HTTP请求，真实的方法与路径见 response.request
+    """
+    index: int
+    name: str
+    args: tuple
+    response: Optional[Response] = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 class BaseAPI:
     def __init__(self, client: Optional[HttpClient] = None, use_session: bool = True):
         self.client = client or HttpClient(
             base_url=settings.base_url,
             timeout=settings.timeout,
             use_session=use_session,
+            cache=ResponseCache.from_config(settings.response_cache_config),
         )
     
     def set_token(self, token: str, token_type: str = "Bearer"):
@@ -30,3 +56,108 @@ class BaseAPI:
     
     def patch(self, endpoint: str, data: Optional[Dict] = None, json: Optional[Dict] = None, **kwargs) -> Response:
         return self.client.patch(endpoint, data=data, json=json, **kwargs)
+
+    def gather(self, *calls: Union[Callable[[], Response], Sequence[Any]], max_workers: Optional[int] = None) -> List[CallResult]:
+        """
+        并发执行多个相互独立的接口调用，结果按传入顺序返回
+        用法: coupon_api.gather((coupon_api.get_coupon_detail, 1), (coupon_api.get_coupon_stock, 1))
+        """
+        jobs = []
+        for index, call in enumerate(calls):
+            if callable(call):
+                func, args = call, ()
+            else:
+                func, args = call[0], tuple(call[1:])
+            name = getattr(func, '__name__', repr(func))
+            jobs.append((CallResult(index=index, name=name, args=args), functools.partial(func, *args)))
+        return execute_concurrently(jobs, max_workers=max_workers or self.client.pool_maxsize)
+
+    def iter_pages(
+        self,
+        list_method: Callable[[Dict], Response],
+        filters: Optional[Dict] = None,
+        page_size: int = 100,
+        prefetch: int = 2,
+        max_items: Optional[int] = None,
+    ) -> Iterator[Dict]:
+        """
+        逐条遍历分页列表接口的所有记录，后台预取后续 prefetch 页
+        用法: for coupon in coupon_api.iter_coupons({"status": "active"}, max_items=1000)
+        """
+        def fetch_page(page: int, size: int) -> Response:
+            return list_method(dict(filters or {}, page=page, page_size=size))
+
+        return iter(PageIterator(fetch_page, page_size=page_size, prefetch=prefetch, max_items=max_items))
+
+
+_StepContext = type(allure.step(''))
+
+
+def _step_title(method: Callable) -> Optional[str]:
+    """
+    取出 @allure.step 包装的接口方法的步骤标题，未被包装时返回 None
+    """
+    if not hasattr(method, '__wrapped__'):
+        return None
+    step = inspect.getclosurevars(method).nonlocals.get('self')
+    return step.title if isinstance(step, _StepContext) else None
+
+
+def _async_step(title: str, method: Callable) -> Callable:
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        with allure.step(title):
+            return await method(*args, **kwargs)
+    return wrapper
+
+
+class AsyncBaseAPI:
+    """
+    异步基础API类，接口方法返回协程，可与现有API类组合使用:
+    class AsyncCouponAPI(AsyncBaseAPI, CouponAPI)
+    同步API类上的 @allure.step 在创建协程时就已结束，子类化时改为在 await 期间打开步骤
+    gather / iter_pages 依赖线程池，异步API不支持，请直接使用 asyncio.gather 并发
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, method in inspect.getmembers(cls, inspect.isfunction):
+            if name in cls.__dict__:
+                continue
+            title = _step_title(method)
+            if title is not None:
+                setattr(cls, name, _async_step(title, method.__wrapped__))
+
+    def __init__(self, client: Optional[AsyncHttpClient] = None, max_concurrency: int = 20):
+        self.client = client or AsyncHttpClient(
+            base_url=settings.base_url,
+            timeout=settings.timeout,
+            max_concurrency=max_concurrency,
+        )
+
+    def set_token(self, token: str, token_type: str = "Bearer"):
+        self.client.set_token(token, token_type)
+
+    async def get(self, endpoint: str, params: Optional[Dict] = None, **kwargs):
+        return await self.client.get(endpoint, params=params, **kwargs)
+
+    async def post(self, endpoint: str, data: Optional[Dict] = None, json: Optional[Dict] = None, **kwargs):
+        return await self.client.post(endpoint, data=data, json=json, **kwargs)
+
+    async def put(self, endpoint: str, data: Optional[Dict] = None, json: Optional[Dict] = None, **kwargs):
+        return await self.client.put(endpoint, data=data, json=json, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs):
+        return await self.client.delete(endpoint, **kwargs)
+
+    async def patch(self, endpoint: str, data: Optional[Dict] = None, json: Optional[Dict] = None, **kwargs):
+        return await self.client.patch(endpoint, data=data, json=json, **kwargs)
+
+    def gather(self, *calls, max_workers: Optional[int] = None):
+        raise NotImplementedError("异步API不支持 gather，请使用 asyncio.gather(api.method1(...), api.method2(...))")
+
+    def iter_pages(self, *args, **kwargs):
+        raise NotImplementedError("异步API不支持分页遍历 iter_*，请使用同步API类（如 CouponAPI.iter_coupons）")
+
+    async def close(self):
+        await self.client.close()
@@ -1,6 +1,6 @@
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 from requests import Response
-from api.base_api import BaseAPI
+from api.base_api import AsyncBaseAPI, BaseAPI
 import allure
 
 
@@ -32,6 +32,15 @@ class CouponAPI(BaseAPI):
     def get_coupon_list(self, params: Optional[Dict] = None) -> Response:
         return self.get("/api/v1/coupons", params=params)
     
+    def iter_coupons(
+        self,
+        filters: Optional[Dict] = None,
+        page_size: int = 100,
+        prefetch: int = 2,
+        max_items: Optional[int] = None,
+    ) -> Iterator[Dict]:
+        return self.iter_pages(self.get_coupon_list, filters, page_size, prefetch, max_items)
+    
     @allure.step("查询用户卡券")
     def get_user_coupons(self, user_id: int, status: Optional[str] = None) -> Response:
         params = {"user_id": user_id}
@@ -58,3 +67,7 @@ class CouponAPI(BaseAPI):
             "user_id": user_id
         }
         return self.post("/api/v1/coupons/batch-receive", json=payload)
+
+
+class AsyncCouponAPI(AsyncBaseAPI, CouponAPI):
+    pass
@@ -1,6 +1,6 @@
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 from requests import Response
-from api.base_api import BaseAPI
+from api.base_api import AsyncBaseAPI, BaseAPI
 import allure
 
 
@@ -25,6 +25,15 @@ class UserAPI(BaseAPI):
     def get_user_list(self, params: Optional[Dict] = None) -> Response:
         return self.get("/api/v1/users", params=params)
     
+    def iter_users(
+        self,
+        filters: Optional[Dict] = None,
+        page_size: int = 100,
+        prefetch: int = 2,
+        max_items: Optional[int] = None,
+    ) -> Iterator[Dict]:
+        return self.iter_pages(self.get_user_list, filters, page_size, prefetch, max_items)
+    
     @allure.step("查询用户资产")
     def get_user_assets(self, user_id: int) -> Response:
         return self.get(f"/api/v1/users/{user_id}/assets")
@@ -32,3 +41,7 @@ class UserAPI(BaseAPI):
     @allure.step("实名认证")
     def verify_identity(self, user_id: int, identity_data: Dict) -> Response:
         return self.post(f"/api/v1/users/{user_id}/verify-identity", json=identity_data)
+
+
+class AsyncUserAPI(AsyncBaseAPI, UserAPI):
+    pass
@@ -63,12 +63,40 @@ class Settings:
     
     @property
     def base_url(self) -> str:
-        return self.env_config.get('base_url', '')
+        return os.getenv('BASE_URL', self.env_config.get('base_url', ''))
     
     @property
     def timeout(self) -> int:
         return self.env_config.get('timeout', 30)
     
+    @property
+    def log_level(self) -> str:
+        return os.getenv('LOG_LEVEL', self.env_config.get('log_level', 'DEBUG')).upper()
+
+    @property
+    def http_log_config(self) -> Dict[str, Any]:
+        return self.env_config.get('http_log', {}) or {}
+
+    @property
+    def resilience_config(self) -> Dict[str, Any]:
+        return self.env_config.get('resilience', {}) or {}
+
+    @property
+    def response_cache_config(self) -> Dict[str, Any]:
+        return self.env_config.get('response_cache', {}) or {}
+
+    @property
+    def token_pool_config(self) -> Dict[str, Any]:
+        return self.env_config.get('token_pool', {}) or {}
+
+    @property
+    def entity_pool_config(self) -> Dict[str, Any]:
+        return self.env_config.get('entity_pool', {}) or {}
+
+    @property
+    def latency_gate_config(self) -> Dict[str, Any]:
+        return self.env_config.get('latency_gate', {}) or {}
+
     @property
     def db_host(self) -> str:
         return self.db_config.get('host', 'localhost')
@@ -89,6 +117,22 @@ class Settings:
     def db_database(self) -> str:
         return self.db_config.get('database', '')
 
+    @property
+    def db_backend(self) -> str:
+        return os.getenv('DB_BACKEND', self.db_config.get('backend', 'mysql')).lower()
+
+    @property
+    def db_sqlite_file(self) -> str:
+        return os.getenv('DB_SQLITE_FILE', self.db_config.get('sqlite_file', ':memory:'))
+
+    @property
+    def db_local_infile(self) -> bool:
+        return bool(self.db_config.get('local_infile', False))
+
+    @property
+    def db_pool_config(self) -> Dict[str, Any]:
+        return self.db_config.get('pool', {}) or {}
+
     @property
     def mobile_platform(self) -> str:
         return os.getenv('MOBILE_PLATFORM', self.mobile_env_config.get('platform', 'android'))
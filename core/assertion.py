@@ -1,9 +1,51 @@
+import hashlib
+import json
+import threading
 import jsonschema
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Union
 from requests import Response
+from config.settings import settings
+from core.http_log_policy import http_log_policy
+from core.json_codec import parse_json
+from core.json_path import MISSING, compile_path, extract_many
 from core.logger import log
 import allure
 
+_validator_cache: Dict[str, Any] = {}
+_validator_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def load_schema(name: str) -> Dict[str, Any]:
+    """
+    从 data/schemas/<name>.json 加载命名Schema
+    """
+    schema_file = settings.data_dir / 'schemas' / f"{name}.json"
+    if not schema_file.exists():
+        raise FileNotFoundError(f"Schema文件不存在: {schema_file}")
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def get_validator(schema: Union[str, Dict[str, Any]]):
+    """
+    按Schema内容哈希缓存已编译的校验器，Schema本身只校验一次
+    """
+    if isinstance(schema, str):
+        schema = load_schema(schema)
+
+    key = hashlib.sha256(json.dumps(schema, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+    validator = _validator_cache.get(key)
+    if validator is None:
+        with _validator_lock:
+            validator = _validator_cache.get(key)
+            if validator is None:
+                validator_cls = jsonschema.validators.validator_for(schema)
+                validator_cls.check_schema(schema)
+                validator = _validator_cache[key] = validator_cls(schema)
+    return validator
+
 
 class EnhancedAssertion:
     
@@ -18,7 +60,7 @@ class EnhancedAssertion:
             log.info(f"✓ 状态码断言通过: {actual_code}")
         except AssertionError as e:
             log.error(f"✗ 状态码断言失败: {msg}")
-            allure.attach(response.text, name="响应内容", attachment_type=allure.attachment_type.TEXT)
+            allure.attach(http_log_policy.render_body(response), name="响应内容", attachment_type=allure.attachment_type.TEXT)
             raise e
     
     @staticmethod
@@ -26,6 +68,9 @@ class EnhancedAssertion:
     def assert_response_time(response: Response, max_time: float = 3.0):
         elapsed_time = response.elapsed.total_seconds()
         msg = f"响应时间 {elapsed_time:.3f}s 超过阈值 {max_time}s"
+        timing = getattr(response, 'timing', None)
+        if timing is not None:
+            msg += f" ({timing})"
         
         try:
             assert elapsed_time <= max_time, msg
@@ -34,12 +79,34 @@ class EnhancedAssertion:
             log.warning(f"✗ 响应时间断言失败: {msg}")
             raise e
     
+    @staticmethod
+    @allure.step("断言服务端耗时")
+    def assert_server_time(response: Response, max_time: float = 1.0):
+        """
+        只断言首字节时间（TTFB），不受DNS/建连/TLS等连接开销影响；响应不含分阶段耗时时退化为 elapsed
+        """
+        timing = getattr(response, 'timing', None)
+        server_time = timing.ttfb if timing is not None else response.elapsed.total_seconds()
+        msg = f"服务端耗时 {server_time:.3f}s 超过阈值 {max_time}s" + (f" ({timing})" if timing is not None else "")
+
+        try:
+            assert server_time <= max_time, msg
+            log.info(f"✓ 服务端耗时断言通过: {server_time:.3f}s")
+        except AssertionError as e:
+            log.warning(f"✗ 服务端耗时断言失败: {msg}")
+            raise e
+
     @staticmethod
     @allure.step("断言JSON Schema")
-    def assert_json_schema(response: Response, schema: Dict[str, Any]):
+    def assert_json_schema(response: Response, schema: Union[str, Dict[str, Any]]):
+        """
+        :param schema: Schema字典，或 data/schemas 下的Schema名称
+        """
         try:
-            json_data = response.json()
-            jsonschema.validate(instance=json_data, schema=schema)
+            json_data = parse_json(response)
+            error = jsonschema.exceptions.best_match(get_validator(schema).iter_errors(json_data))
+            if error is not None:
+                raise error
             log.info("✓ JSON Schema验证通过")
         except jsonschema.ValidationError as e:
             log.error(f"✗ JSON Schema验证失败: {e.message}")
@@ -48,12 +115,57 @@ class EnhancedAssertion:
         except ValueError as e:
             log.error(f"✗ 响应不是有效的JSON格式: {str(e)}")
             raise AssertionError("响应不是有效的JSON格式")
-    
+
+    @staticmethod
+    @allure.step("批量断言列表元素JSON Schema")
+    def assert_json_schema_each(
+        response: Response,
+        item_schema: Union[str, Dict[str, Any]],
+        items_path: str = "",
+        max_report: int = 20,
+    ):
+        """
+        使用同一个已编译校验器一次遍历校验列表中的每个元素，汇总所有失败下标
+        :param item_schema: 单个元素的Schema字典或Schema名称
+        :param items_path: 列表所在字段路径，如 data.items；为空表示响应本身是列表
+        :param max_report: 失败详情最多展示的条数
+        """
+        try:
+            json_data = parse_json(response)
+        except ValueError as e:
+            log.error(f"✗ 响应不是有效的JSON格式: {str(e)}")
+            raise AssertionError("响应不是有效的JSON格式")
+
+        try:
+            items = EnhancedAssertion._get_nested_value(json_data, items_path) if items_path else json_data
+        except KeyError as e:
+            raise AssertionError(f"无法获取字段 {items_path}: {str(e)}")
+        if not isinstance(items, list):
+            raise AssertionError(f"字段 {items_path or '<root>'} 不是列表")
+
+        validator = get_validator(item_schema)
+        failures = []
+        for index, item in enumerate(items):
+            error = jsonschema.exceptions.best_match(validator.iter_errors(item))
+            if error is not None:
+                failures.append((index, error))
+
+        if failures:
+            details = "\n".join(
+                f"[{index}] {'.'.join(str(p) for p in error.absolute_path) or '<item>'}: {error.message}"
+                for index, error in failures[:max_report]
+            )
+            msg = f"JSON Schema验证失败: {len(failures)}/{len(items)} 个元素不符合, 下标 {[i for i, _ in failures]}"
+            log.error(f"✗ {msg}")
+            allure.attach(details, name="Schema验证错误", attachment_type=allure.attachment_type.TEXT)
+            raise AssertionError(msg)
+        log.info(f"✓ JSON Schema批量验证通过: {len(items)} 个元素")
+
     @staticmethod
     @allure.step("断言包含字段")
     def assert_contains_fields(response: Response, fields: List[str], message: str = ""):
         try:
-            json_data = response.json()
+            json_data = parse_json(response)
             missing_fields = [field for field in fields if field not in json_data]
             
             msg = message or f"缺少字段: {missing_fields}"
@@ -63,14 +175,14 @@ class EnhancedAssertion:
             raise AssertionError("响应不是有效的JSON格式")
         except AssertionError as e:
             log.error(f"✗ 字段存在断言失败: {msg}")
-            allure.attach(response.text, name="响应内容", attachment_type=allure.attachment_type.TEXT)
+            allure.attach(http_log_policy.render_body(response), name="响应内容", attachment_type=allure.attachment_type.TEXT)
             raise e
     
     @staticmethod
     @allure.step("断言字段值")
     def assert_field_value(response: Response, field: str, expected_value: Any, message: str = ""):
         try:
-            json_data = response.json()
+            json_data = parse_json(response)
             actual_value = EnhancedAssertion._get_nested_value(json_data, field)
             
             msg = message or f"字段 {field} 期望值 {expected_value}, 实际值 {actual_value}"
@@ -82,13 +194,37 @@ class EnhancedAssertion:
             log.error(f"✗ 字段值断言失败: {msg}")
             raise e
     
+    @staticmethod
+    @allure.step("批量断言字段值")
+    def assert_fields(response: Response, expected: Dict[str, Any], message: str = ""):
+        """
+        一次解析、一次遍历校验多个字段，汇总全部不一致项
+        :param expected: {路径: 期望值}，期望值也可以是返回bool的函数，如 {"data.items.*.status": lambda v: set(v) == {"active"}}
+        """
+        try:
+            json_data = parse_json(response)
+        except ValueError:
+            raise AssertionError("响应不是有效的JSON格式")
+
+        actual_values = extract_many(json_data, expected.keys())
+        mismatches = []
+        for field, expected_value in expected.items():
+            actual_value = actual_values[field]
+            if actual_value is MISSING:
+                mismatches.append(f"字段 {field} 不存在")
+            elif callable(expected_value):
+                if not expected_value(actual_value):
+                    mismatches.append(f"字段 {field} 实际值 {actual_value} 不满足校验函数")
+            elif actual_value != expected_value:
+                mismatches.append(f"字段 {field} 期望值 {expected_value}, 实际值 {actual_value}")
+
+        if mismatches:
+            msg = message or f"{len(mismatches)} 个字段断言失败:\n" + "\n".join(mismatches)
+            log.error(f"✗ 字段值断言失败: {msg}")
+            allure.attach("\n".join(mismatches), name="字段断言失败明细", attachment_type=allure.attachment_type.TEXT)
+            raise AssertionError(msg)
+        log.info(f"✓ 字段值断言通过: {len(expected)} 个字段")
+
     @staticmethod
     def _get_nested_value(data: Dict, field: str) -> Any:
-        keys = field.split('.')
-        value = data
-        for key in keys:
-            if isinstance(value, dict):
-                value = value[key]
-            else:
-                raise KeyError(f"字段 {field} 不存在")
-        return value
+        return compile_path(field).get(data)
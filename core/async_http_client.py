@@ -0,0 +1,154 @@
+import asyncio
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from core.decorator import async_log_request_response, async_retry
+from core.json_codec import encode_json
+from core.logger import log
+from core.resilience import circuit_breakers, retry_budget
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - 运行环境未安装httpx时降级
+    httpx = None
+
+RETRY_EXCEPTIONS = (httpx.TransportError,) if httpx is not None else ()
+
+
+class AsyncHttpClient:
+    """
+    基于 httpx.AsyncClient 的异步HTTP客户端，接口与 HttpClient 保持一致
+    :param max_concurrency: 同一客户端同时在途的最大请求数
+    :param max_connections: 连接池最大连接数
+    :param max_keepalive_connections: 连接池保持的空闲长连接数
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 30,
+        token: Optional[str] = None,
+        max_concurrency: int = 20,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+    ):
+        if httpx is None:
+            raise RuntimeError('未安装 httpx，请先执行 pip install -r requirements.txt')
+
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.session = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            headers={
+                'Content-Type': 'application/json',
+                'User-Agent': 'Automated-Test-Framework/1.0'
+            },
+        )
+
+        if token:
+            self.set_token(token)
+
+    def set_token(self, token: str, token_type: str = "Bearer"):
+        self.session.headers['Authorization'] = f"{token_type} {token}"
+        log.info(f"Token已设置: {token_type} {token[:20]}...")
+
+    def remove_token(self):
+        if 'Authorization' in self.session.headers:
+            del self.session.headers['Authorization']
+            log.info("Token已移除")
+
+    def set_headers(self, headers: Dict[str, str]):
+        self.session.headers.update(headers)
+
+    @async_retry(
+        max_attempts=3,
+        delay=0.5,
+        exceptions=RETRY_EXCEPTIONS,
+        allowed_methods=("GET", "HEAD", "OPTIONS"),
+        backoff="exponential",
+        jitter=True,
+        max_delay=5.0,
+        budget=retry_budget,
+        retry_on_status=(429, 503),
+    )
+    @async_log_request_response
+    async def request(self, method: str, endpoint: str, **kwargs) -> "httpx.Response":
+        url = f"{self.base_url}{endpoint}" if not endpoint.startswith('http') else endpoint
+        kwargs.setdefault('timeout', self.timeout)
+
+        if kwargs.get('json') is not None and not kwargs.get('data'):
+            kwargs.pop('data', None)
+            kwargs['content'] = encode_json(kwargs.pop('json'))
+
+        breaker = circuit_breakers.get(urlparse(url).netloc)
+        if breaker is not None:
+            breaker.before_call()
+
+        response, error = None, None
+        try:
+            async with self.semaphore:
+                response = await self.session.request(method, url, **kwargs)
+        except BaseException as e:
+            # 包括协程被取消，半开探测名额也要释放
+            error = e
+            if isinstance(e, httpx.HTTPError):
+                log.error(f"请求异常: {method} {url}, 错误: {str(e)}")
+            raise
+        finally:
+            if breaker is not None:
+                breaker.record_outcome(
+                    response.status_code if response is not None else None,
+                    transport_error=isinstance(error, (httpx.TimeoutException, httpx.NetworkError)),
+                )
+        return response
+
+    async def get(self, endpoint: str, params: Optional[Dict] = None, **kwargs) -> "httpx.Response":
+        return await self.request('GET', endpoint, params=params, **kwargs)
+
+    async def post(
+        self,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        json: Optional[Dict] = None,
+        **kwargs,
+    ) -> "httpx.Response":
+        return await self.request('POST', endpoint, data=data, json=json, **kwargs)
+
+    async def put(
+        self,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        json: Optional[Dict] = None,
+        **kwargs,
+    ) -> "httpx.Response":
+        return await self.request('PUT', endpoint, data=data, json=json, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs) -> "httpx.Response":
+        return await self.request('DELETE', endpoint, **kwargs)
+
+    async def patch(
+        self,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        json: Optional[Dict] = None,
+        **kwargs,
+    ) -> "httpx.Response":
+        return await self.request('PATCH', endpoint, data=data, json=json, **kwargs)
+
+    async def close(self):
+        await self.session.aclose()
+        log.info("异步HTTP会话已关闭")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,256 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config.settings import settings
+from core.logger import log
+
+CASSETTE_MODES = ('off', 'record', 'replay')
+REDACTED_FIELDS = frozenset({'token', 'refresh_token', 'access_token', 'authorization'})
+REDACTED_VALUE = "REDACTED"
+
+
+class CassetteMissError(RuntimeError):
+    """
+    回放模式下找不到匹配的录制记录
+    """
+
+
+def redact(value: Any) -> Any:
+    """
+    把登录凭证类字段替换为占位符，录制文件可以直接提交到仓库
+    """
+    if isinstance(value, dict):
+        return {
+            k: REDACTED_VALUE if str(k).lower() in REDACTED_FIELDS and v else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+def _redact_body(text: str) -> str:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+    redacted = redact(data)
+    return text if redacted == data else json.dumps(redacted, ensure_ascii=False)
+
+
+def normalize_request(method: str, url: str, kwargs: Dict[str, Any]) -> Tuple[str, str, str]:
+    """
+    返回 (METHOD, 规范化路径+排序后的查询串, 规范化请求体)，忽略主机以便跨环境回放
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    params = kwargs.get('params') or {}
+    if isinstance(params, dict):
+        query.extend((str(k), str(v)) for k, v in params.items() if v is not None)
+    else:
+        query.extend((str(k), str(v)) for k, v in params)
+    target = parts.path + (f"?{urlencode(sorted(query))}" if query else "")
+
+    body = kwargs.get('data')
+    if body is None and kwargs.get('json') is not None:
+        body = json.dumps(kwargs['json'])
+    if isinstance(body, (bytes, bytearray)):
+        body = bytes(body).decode('utf-8', errors='replace')
+    if isinstance(body, str):
+        try:
+            body = json.dumps(redact(json.loads(body)), sort_keys=True, ensure_ascii=False)
+        except ValueError:
+            pass
+    elif body is not None:
+        body = json.dumps(redact(body), sort_keys=True, ensure_ascii=False, default=str)
+    return method.upper(), target, body or ''
+
+
+def request_key(method: str, target: str, body: str) -> str:
+    return hashlib.sha1(f"{method}\n{target}\n{body}".encode('utf-8')).hexdigest()
+
+
+class Cassette:
+    """
+    单个用例的录制文件（gzip压缩的JSON Lines），回放时首次请求才加载并建立索引:
+    优先按 方法+路径+请求体 精确匹配，请求体含随机数据对不上时按 方法+路径 的录制顺序匹配，
+    录制记录用完后重复返回该路径最后一条（如轮询查询）
+    :param seed: 用例测试数据的随机种子，录制时每次随机生成并写入索引，回放时沿用录制时的种子
+    """
+
+    def __init__(self, nodeid: str, path: Path, mode: str, seed: Optional[str] = None):
+        self.nodeid = nodeid
+        self.path = path
+        self.mode = mode
+        self.seed = seed
+        self.interactions: List[Dict[str, Any]] = []
+        self._loaded = False
+        self._by_key: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_target: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._loaded:
+            return
+        if not self.path.exists():
+            raise CassetteMissError(f"录制文件不存在: {self.path}，请先以 HTTP_CASSETTE=record 运行该用例")
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                interaction = json.loads(line)
+                self._by_key.setdefault(interaction['key'], []).append(interaction)
+                self._by_target.setdefault((interaction['method'], interaction['target']), []).append(interaction)
+        self._loaded = True
+
+    def record(self, method: str, url: str, kwargs: Dict[str, Any], response: requests.Response):
+        method, target, body = normalize_request(method, url, kwargs)
+        content = response.content or b''
+        interaction = {
+            "key": request_key(method, target, body),
+            "method": method,
+            "target": target,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": redact(dict(response.headers)),
+            "elapsed": response.elapsed.total_seconds() if response.elapsed else 0.0,
+        }
+        try:
+            interaction["body"] = _redact_body(content.decode('utf-8'))
+        except UnicodeDecodeError:
+            interaction["body_b64"] = base64.b64encode(content).decode('ascii')
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def replay(self, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        method, target, body = normalize_request(method, url, kwargs)
+        with self._lock:
+            self._load()
+            same_target = self._by_target.get((method, target))
+            interaction = self._take(self._by_key.get(request_key(method, target, body))) or self._take(same_target)
+            if interaction is None and same_target:
+                interaction = same_target[-1]
+        if interaction is None:
+            raise CassetteMissError(f"录制文件中没有匹配的请求: {method} {target} ({self.path.name})")
+        return self._build_response(interaction, url)
+
+    @staticmethod
+    def _take(candidates: Optional[List[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        for interaction in candidates or ():
+            if not interaction.get('_used'):
+                interaction['_used'] = True
+                return interaction
+        return None
+
+    @staticmethod
+    def _build_response(interaction: Dict[str, Any], url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = interaction['status']
+        response.reason = interaction.get('reason')
+        response.headers = CaseInsensitiveDict(interaction.get('headers') or {})
+        response.headers.pop('Content-Encoding', None)
+        if 'body_b64' in interaction:
+            response._content = base64.b64decode(interaction['body_b64'])
+        else:
+            response._content = interaction.get('body', '').encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = url
+        response.elapsed = timedelta(seconds=interaction.get('elapsed', 0.0))
+        return response
+
+    def save(self) -> int:
+        with self._lock:
+            interactions = list(self.interactions)
+        if not interactions:
+            return 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            for interaction in interactions:
+                f.write(json.dumps(interaction, ensure_ascii=False, separators=(',', ':')) + '\n')
+        return len(interactions)
+
+
+class CassetteLibrary:
+    """
+    按用例管理录制文件: record 模式录制并在用例结束时落盘，replay 模式完全不访问网络
+    模式由环境变量 HTTP_CASSETTE=off/record/replay 控制
+    """
+
+    def __init__(self, cassette_dir: Path, mode: str = 'off'):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"HTTP_CASSETTE 仅支持 {CASSETTE_MODES}, 实际: {mode}")
+        self.cassette_dir = Path(cassette_dir)
+        self.mode = mode
+        self.current: Optional[Cassette] = None
+        self.recorded: Dict[str, Dict[str, Any]] = {}
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+
+    @property
+    def index_file(self) -> Path:
+        return self.cassette_dir / 'index.json'
+
+    @staticmethod
+    def file_name(nodeid: str) -> str:
+        readable = re.sub(r'[^\w.-]+', '_', nodeid.rsplit('/', 1)[-1])[:80].strip('_')
+        digest = hashlib.sha1(nodeid.encode('utf-8')).hexdigest()[:10]
+        return f"{readable}-{digest}.jsonl.gz"
+
+    def _index_entry(self, nodeid: str) -> Dict[str, Any]:
+        if self._index is None:
+            self._index = {}
+            if self.index_file.exists():
+                self._index = json.loads(self.index_file.read_text(encoding='utf-8'))
+        return self._index.get(nodeid) or {}
+
+    def start(self, nodeid: str):
+        if not self.enabled:
+            return
+        entry = self._index_entry(nodeid)
+        path = self.cassette_dir / entry.get('file', self.file_name(nodeid))
+        if self.mode == 'record':
+            # 每次录制使用新的种子，重新录制时不会生成与真实环境已有数据同名的用户/卡券
+            seed = f"{nodeid}#{uuid.uuid4().hex[:8]}"
+        else:
+            seed = entry.get('seed', nodeid)
+        self.current = Cassette(nodeid, path, self.mode, seed)
+
+    def stop(self):
+        cassette, self.current = self.current, None
+        if cassette is None or self.mode != 'record':
+            return
+        count = cassette.save()
+        if count:
+            self.recorded[cassette.nodeid] = {"file": cassette.path.name, "interactions": count, "seed": cassette.seed}
+            log.info(f"已录制 {count} 个请求: {cassette.path.name}")
+
+    def update_index(self, entries: Dict[str, Dict[str, Any]]):
+        if not entries:
+            return
+        index = {}
+        if self.index_file.exists():
+            index = json.loads(self.index_file.read_text(encoding='utf-8'))
+        index.update(entries)
+        self.cassette_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file.write_text(json.dumps(index, ensure_ascii=False, indent=2, sort_keys=True), encoding='utf-8')
+        log.info(f"录制索引已更新: {self.index_file}, 共 {len(index)} 个用例")
+
+
+cassette_library = CassetteLibrary(
+    settings.data_dir / 'cassettes',
+    os.getenv('HTTP_CASSETTE', 'off').lower(),
+)
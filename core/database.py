@@ -1,11 +1,52 @@
-import pymysql
-from typing import List, Dict, Any, Optional
+import csv
+import threading
+import yaml
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Union
 from contextlib import contextmanager
+from config.settings import settings
+from core.db_backend import DatabaseBackend, MySQLBackend, SQLiteBackend, split_sql_statements
+from core.db_pool import ConnectionPool
 from core.logger import log
 
 
+class _IsolatedConnection:
+    """
+    事务隔离期间交给各方法使用的连接: commit/rollback 不生效，由 isolated() 退出时统一回滚
+    MySQL 中单条语句失败只回滚该语句本身，不影响事务内之前的修改
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
 class DatabaseHelper:
-    def __init__(self, host: str, port: int, user: str, password: str, database: str, charset: str = 'utf8mb4'):
+    def __init__(
+        self,
+        host: str = '',
+        port: int = 3306,
+        user: str = '',
+        password: str = '',
+        database: str = '',
+        charset: str = 'utf8mb4',
+        pool_config: Optional[Dict[str, Any]] = None,
+        local_infile: bool = False,
+        backend: Optional[DatabaseBackend] = None,
+    ):
+        """
+        :param pool_config: 连接池参数 min_size/max_size/max_lifetime/ping_interval/wait_timeout，见 ConnectionPool
+        :param local_infile: 允许 LOAD DATA LOCAL INFILE，仅在需要批量导入 CSV 时开启
+        :param backend: 数据库后端，默认按连接参数使用 MySQL；离线运行见 DatabaseHelper.sqlite
+        """
         self.config = {
             'host': host,
             'port': port,
@@ -14,24 +55,104 @@ class DatabaseHelper:
             'database': database,
             'charset': charset
         }
-        self.connection = None
+        if local_infile:
+            self.config['local_infile'] = True
+        self.backend = backend or MySQLBackend(self.config)
+        self.pool = ConnectionPool(
+            self.backend.connect,
+            in_transaction=self.backend.in_transaction,
+            ping=self.backend.ping,
+            **(pool_config or {})
+        )
+        self._local = threading.local()
+    
+    @classmethod
+    def sqlite(
+        cls,
+        database: Union[str, Path] = ':memory:',
+        schema: Optional[Union[str, Path]] = 'setup.sql',
+        pool_config: Optional[Dict[str, Any]] = None,
+    ) -> "DatabaseHelper":
+        """
+        使用 SQLite 的 DatabaseHelper，建表脚本按 MySQL 语法编写即可（自动转换），用于无 MySQL 时离线调试校验逻辑
+        内存库多连接并发写会直接报表锁定，因此内存库的连接池固定为 1 个连接
+        :param database: 数据库文件路径，默认进程内存库
+        :param schema: 初始化时执行的建表脚本，None 表示不执行
+        """
+        pool_config = dict(pool_config or {})
+        if str(database) == ':memory:':
+            pool_config.update(min_size=1, max_size=1)
+        helper = cls(database=str(database), pool_config=pool_config, backend=SQLiteBackend(database))
+        if schema:
+            helper.run_script(schema)
+        return helper
     
     @contextmanager
     def get_connection(self):
+        bound = getattr(self._local, 'connection', None)
+        if bound is not None:
+            yield bound
+            return
         try:
-            self.connection = pymysql.connect(**self.config)
-            yield self.connection
+            pooled = self.pool.acquire()
         except Exception as e:
             log.error(f"数据库连接失败: {str(e)}")
             raise
+        discard = False
+        try:
+            yield pooled.connection
+        except self.backend.disconnect_errors:
+            discard = True
+            raise
+        finally:
+            self.pool.release(pooled, discard)
+    
+    @contextmanager
+    def isolated(self):
+        """
+        测试数据隔离: 在一个连接上开启事务，期间本线程通过 DatabaseHelper 执行的读写都在该事务内、不会提交，
+        退出时整体回滚；嵌套调用时使用保存点，只回滚内层的修改
+        注意: 被测服务看不到未提交的数据，只适用于直接写库准备数据、再由 DatabaseHelper 校验的用例；DDL 会隐式提交
+        """
+        bound = getattr(self._local, 'connection', None)
+        if bound is not None:
+            self._local.depth += 1
+            savepoint = f"test_isolation_{self._local.depth}"
+            with bound.cursor() as cursor:
+                cursor.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield self
+            finally:
+                with bound.cursor() as cursor:
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                self._local.depth -= 1
+            return
+
+        pooled = self.pool.acquire()
+        discard = False
+        try:
+            pooled.connection.begin()
+            self._local.connection = _IsolatedConnection(pooled.connection)
+            self._local.depth = 0
+            yield self
         finally:
-            if self.connection:
-                self.connection.close()
+            self._local.connection = None
+            try:
+                pooled.connection.rollback()
+            except Exception as e:
+                log.warning(f"回滚测试事务失败: {str(e)}")
+                discard = True
+            self.pool.release(pooled, discard)
+    
+    def close(self):
+        self.pool.log_stats()
+        self.pool.close()
+        self.backend.close()
     
     def execute_query(self, sql: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
         with self.get_connection() as conn:
             try:
-                with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                with conn.cursor(self.backend.dict_cursor) as cursor:
                     cursor.execute(sql, params)
                     results = cursor.fetchall()
                     log.info(f"查询成功: {sql}, 返回 {len(results)} 条记录")
@@ -40,6 +161,73 @@ class DatabaseHelper:
                 log.error(f"查询失败: {sql}, 错误: {str(e)}")
                 raise
     
+    def iter_query(
+        self,
+        sql: str,
+        params: Optional[tuple] = None,
+        chunk_size: int = 1000,
+        row_format: str = 'dict',
+        batched: bool = False,
+    ) -> Iterator[Any]:
+        """
+        使用服务端游标流式读取大结果集，每次只从网络读取 chunk_size 行，内存占用与结果集大小无关
+        遍历期间独占一个连接；提前结束遍历时直接关闭该连接，而不是把剩余结果读完；
+        在 isolated() 中则要读完剩余结果，连接才能执行下一条语句
+        游标只在生成器关闭时才释放，提前 break 时应使用 contextlib.closing(db_helper.iter_query(...)) 包裹，
+        而不是等待垃圾回收
+        :param row_format: dict 按行返回字典；tuple 按行返回元组（省去构造字典的开销）；
+                           columns 按批返回 {列名: [值, ...]} 的列式数据，始终分批
+        :param batched: 为 True 时每次返回 chunk_size 行组成的列表
+        """
+        if row_format not in ('dict', 'tuple', 'columns'):
+            raise ValueError(f"不支持的行格式: {row_format}")
+
+        bound = getattr(self._local, 'connection', None)
+        pooled = self.pool.acquire() if bound is None else None
+        finished = False
+        total = 0
+        try:
+            cursor = (bound or pooled.connection).cursor(self.backend.stream_cursor)
+            try:
+                cursor.execute(sql, params)
+                columns = [column[0] for column in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    total += len(rows)
+                    if row_format == 'columns':
+                        yield {name: list(values) for name, values in zip(columns, zip(*rows))}
+                    elif row_format == 'dict':
+                        rows = [dict(zip(columns, row)) for row in rows]
+                        if batched:
+                            yield rows
+                        else:
+                            yield from rows
+                    elif batched:
+                        yield list(rows)
+                    else:
+                        yield from rows
+                finished = True
+                log.info(f"流式查询完成: {sql}, 返回 {total} 条记录")
+            except Exception as e:
+                log.error(f"流式查询失败: {sql}, 错误: {str(e)}")
+                raise
+            finally:
+                # 隔离事务中的连接不能断开，只能把剩余结果读完后才能执行下一条语句
+                if bound is not None and not finished:
+                    try:
+                        while cursor.fetchmany(chunk_size):
+                            pass
+                    except Exception as e:
+                        log.warning(f"读完流式查询剩余结果失败: {str(e)}")
+                if finished or bound is not None:
+                    cursor.close()
+        finally:
+            # 未读完的服务端结果集只能读完或断开，百万行时断开连接更快
+            if pooled is not None:
+                self.pool.release(pooled, discard=not finished)
+    
     def execute_update(self, sql: str, params: Optional[tuple] = None) -> int:
         with self.get_connection() as conn:
             try:
@@ -66,6 +254,135 @@ class DatabaseHelper:
                 log.error(f"批量执行失败: {sql}, 错误: {str(e)}")
                 raise
     
+    def run_script(self, script: Union[str, Path], stop_on_error: bool = True) -> int:
+        """
+        执行多语句 SQL 文件，相对路径按 data/sql 查找，如 run_script('setup.sql')
+        所有语句在同一连接上执行、最后统一提交（DDL 在 MySQL 中会隐式提交）
+        :param stop_on_error: 为 False 时跳过失败的语句继续执行
+        :return: 成功执行的语句数
+        """
+        path = Path(script)
+        if not path.is_absolute() and not path.exists():
+            path = settings.data_dir / 'sql' / path
+        statements = self.backend.prepare_script(path.read_text(encoding='utf-8'))
+
+        executed = 0
+        with self.get_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    for statement in statements:
+                        try:
+                            cursor.execute(statement)
+                            executed += 1
+                        except self.backend.error as e:
+                            if stop_on_error:
+                                raise
+                            log.warning(f"SQL语句执行失败，已跳过: {statement[:100]}, 错误: {str(e)}")
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                log.error(f"执行SQL脚本失败: {path}, 错误: {str(e)}")
+                raise
+        log.info(f"执行SQL脚本完成: {path.name}, 共 {len(statements)} 条语句, 成功 {executed} 条")
+        return executed
+    
+    @staticmethod
+    def _insert_rows(cursor, table: str, rows: Sequence[Dict[str, Any]], columns: Optional[List[str]], chunk_size: int) -> int:
+        if not rows:
+            return 0
+        columns = columns or list(rows[0].keys())
+        column_sql = ', '.join(f"`{column}`" for column in columns)
+        row_sql = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        inserted = 0
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            sql = f"INSERT INTO `{table}` ({column_sql}) VALUES " + ', '.join([row_sql] * len(chunk))
+            inserted += cursor.execute(sql, [row.get(column) for row in chunk for column in columns])
+        return inserted
+    
+    def bulk_insert(
+        self,
+        tables: Union[str, Dict[str, Sequence[Dict[str, Any]]]],
+        rows: Optional[Sequence[Dict[str, Any]]] = None,
+        columns: Optional[List[str]] = None,
+        chunk_size: int = 1000,
+    ) -> Dict[str, int]:
+        """
+        多行 INSERT 批量写入，每 chunk_size 行一条语句，所有表在一个事务内提交
+        用法: bulk_insert('coupons', rows) 或 bulk_insert({'coupons': rows, 'user_coupons': rows})
+        :param columns: 写入的列，默认取第一行的键；行内缺少的列写入 NULL
+        :return: 各表写入行数
+        """
+        data = {tables: rows or []} if isinstance(tables, str) else tables
+        inserted: Dict[str, int] = {}
+        with self.get_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    for table, table_rows in data.items():
+                        inserted[table] = self._insert_rows(cursor, table, table_rows, columns, chunk_size)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                log.error(f"批量写入失败: {list(data)}, 错误: {str(e)}")
+                raise
+        log.info(f"批量写入成功: {inserted}")
+        return inserted
+    
+    def load_csv_infile(self, table: str, csv_file: Union[str, Path]) -> int:
+        """
+        使用 LOAD DATA LOCAL INFILE 导入带表头的 CSV，由服务端直接解析，适合十万行以上的数据
+        需在 db_config.yaml 中开启 local_infile，且服务端允许 local_infile
+        """
+        if not self.backend.supports_local_infile:
+            raise RuntimeError(f"{self.backend.name} 后端不支持 LOAD DATA LOCAL INFILE，请使用 bulk_insert")
+        if not self.config.get('local_infile'):
+            raise RuntimeError('未开启 local_infile，请在 config/db_config.yaml 中设置 local_infile: true')
+        path = Path(csv_file).resolve()
+        with open(path, encoding='utf-8', newline='') as f:
+            header = f.readline()
+        columns = next(csv.reader([header]))
+        line_end = '\\r\\n' if header.endswith('\r\n') else '\\n'
+        column_sql = ', '.join(f"`{column}`" for column in columns)
+        sql = (
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE `{table}` CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '{line_end}' "
+            f"IGNORE 1 LINES ({column_sql})"
+        )
+        return self.execute_update(sql, (str(path),))
+    
+    def load_fixture(
+        self,
+        fixture_file: Union[str, Path],
+        table: Optional[str] = None,
+        chunk_size: int = 1000,
+        use_infile: bool = False,
+    ) -> Dict[str, int]:
+        """
+        从 YAML/CSV 批量导入测试数据，相对路径按 data/sql 查找
+        YAML 可以是 {表名: [行, ...]} 或行列表（需指定 table）；CSV 首行为列名，表名默认取文件名，\\N 表示 NULL
+        :param use_infile: CSV 使用 LOAD DATA LOCAL INFILE 导入
+        :return: 各表导入行数
+        """
+        path = Path(fixture_file)
+        if not path.is_absolute() and not path.exists():
+            path = settings.data_dir / 'sql' / path
+
+        if path.suffix.lower() == '.csv':
+            table = table or path.stem
+            if use_infile:
+                return {table: self.load_csv_infile(table, path)}
+            with open(path, encoding='utf-8', newline='') as f:
+                rows = [{k: (None if v == '\\N' else v) for k, v in row.items()} for row in csv.DictReader(f)]
+            return self.bulk_insert(table, rows, chunk_size=chunk_size)
+
+        with open(path, encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+        if isinstance(data, list):
+            if not table:
+                raise ValueError(f"数据文件为行列表时需要指定表名: {path}")
+            data = {table: data}
+        return self.bulk_insert(data, chunk_size=chunk_size)
+    
     def query_one(self, sql: str, params: Optional[tuple] = None) -> Optional[Dict[str, Any]]:
         results = self.execute_query(sql, params)
         return results[0] if results else None
@@ -81,3 +398,65 @@ class DatabaseHelper:
     def delete_test_data(self, table: str, condition: str, params: Optional[tuple] = None):
         sql = f"DELETE FROM {table} WHERE {condition}"
         return self.execute_update(sql, params)
+
+    def check_coupon_invariants(self, coupon_id: int, initial_stock: Optional[int] = None) -> List[str]:
+        """
+        并发领取后校验卡券库存与领取记录的一致性，返回违反项描述，空列表表示全部满足
+        :param initial_stock: 并发领取前的可用库存，传入时额外校验 初始库存 - 剩余库存 == 领取记录数
+        """
+        coupon = self.query_coupon(coupon_id)
+        if not coupon:
+            return [f"卡券不存在: {coupon_id}"]
+
+        violations = []
+        received = self.query_one("SELECT COUNT(*) AS cnt FROM user_coupons WHERE coupon_id = %s", (coupon_id,))['cnt']
+        if coupon['available_stock'] < 0:
+            violations.append(f"可用库存为负: {coupon['available_stock']}")
+        if received > coupon['total_stock']:
+            violations.append(f"超发: 领取记录 {received} 条, 总库存 {coupon['total_stock']}")
+        if initial_stock is not None and initial_stock - coupon['available_stock'] != received:
+            violations.append(
+                f"库存扣减与领取记录不一致: 初始库存 {initial_stock}, 剩余 {coupon['available_stock']}, 领取记录 {received} 条"
+            )
+
+        duplicate_codes = self.execute_query(
+            "SELECT coupon_code, COUNT(*) AS cnt FROM user_coupons "
+            "WHERE coupon_code IN (SELECT coupon_code FROM user_coupons WHERE coupon_id = %s) "
+            "GROUP BY coupon_code HAVING cnt > 1",
+            (coupon_id,)
+        )
+        for row in duplicate_codes:
+            violations.append(f"卡券码重复: {row['coupon_code']} 出现 {row['cnt']} 次")
+
+        duplicate_users = self.execute_query(
+            "SELECT user_id, COUNT(*) AS cnt FROM user_coupons WHERE coupon_id = %s GROUP BY user_id HAVING cnt > 1",
+            (coupon_id,)
+        )
+        for row in duplicate_users:
+            violations.append(f"用户重复领取: user_id={row['user_id']} 领取 {row['cnt']} 次")
+        return violations
+
+    def check_activity_invariants(self, activity_id: int) -> List[str]:
+        """
+        并发参与后校验活动人数上限与参与记录的一致性，返回违反项描述
+        """
+        activity = self.query_one("SELECT * FROM activities WHERE id = %s", (activity_id,))
+        if not activity:
+            return [f"活动不存在: {activity_id}"]
+
+        violations = []
+        joined = self.query_one(
+            "SELECT COUNT(*) AS cnt FROM activity_participants WHERE activity_id = %s", (activity_id,)
+        )['cnt']
+        if activity['max_participants'] and joined > activity['max_participants']:
+            violations.append(f"参与人数超限: 参与记录 {joined} 条, 上限 {activity['max_participants']}")
+        if activity['current_participants'] != joined:
+            violations.append(f"参与人数计数不一致: current_participants={activity['current_participants']}, 参与记录 {joined} 条")
+
+        duplicate_users = self.execute_query(
+            "SELECT user_id, COUNT(*) AS cnt FROM activity_participants WHERE activity_id = %s GROUP BY user_id HAVING cnt > 1",
+            (activity_id,)
+        )
+        for row in duplicate_users:
+            violations.append(f"用户重复参与: user_id={row['user_id']} 参与 {row['cnt']} 次")
+        return violations
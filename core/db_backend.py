@@ -0,0 +1,333 @@
+import re
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import pymysql
+from pymysql.constants.SERVER_STATUS import SERVER_STATUS_IN_TRANS
+
+
+def _quoted_end(text: str, start: int) -> int:
+    """
+    返回从 start 处引号开始的字符串/标识符的结束位置（含结束引号），支持反斜杠转义和双写引号
+    """
+    quote, end, length = text[start], start + 1, len(text)
+    while end < length:
+        if text[end] == '\\' and quote != '`':
+            end += 2
+            continue
+        if text[end] == quote:
+            if end + 1 < length and text[end + 1] == quote:
+                end += 2
+                continue
+            return end + 1
+        end += 1
+    return length
+
+
+def split_sql_statements(script: str) -> List[str]:
+    """
+    把多语句 SQL 脚本按分号拆分为单条语句，忽略字符串、反引号标识符和注释中的分号，并去掉注释
+    """
+    statements: List[str] = []
+    current: List[str] = []
+    i, length = 0, len(script)
+    while i < length:
+        char = script[i]
+        if char in ("'", '"', '`'):
+            end = _quoted_end(script, i)
+            current.append(script[i:end])
+            i = end
+        elif script.startswith('--', i) or char == '#':
+            end = script.find('\n', i)
+            i = length if end == -1 else end
+        elif script.startswith('/*', i):
+            end = script.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            current.append(' ')
+        elif char == ';':
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            i += 1
+        else:
+            current.append(char)
+            i += 1
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def _split_top_level(text: str) -> List[str]:
+    """
+    按不在括号和引号内的逗号拆分，用于拆出 CREATE TABLE 中的列定义
+    """
+    parts, depth, start, i = [], 0, 0, 0
+    while i < len(text):
+        char = text[i]
+        if char in ("'", '"', '`'):
+            i = _quoted_end(text, i)
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+        i += 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+
+class DatabaseBackend:
+    """
+    DatabaseHelper 的数据库驱动适配: 负责建立连接、判断事务状态、健康检查以及脚本方言转换
+    各方法中的 SQL 统一使用 pymysql 的 %s 占位符，由后端自行转换
+    """
+    name = ''
+    dict_cursor: Any = None
+    stream_cursor: Any = None
+    error: Tuple[type, ...] = (Exception,)
+    disconnect_errors: Tuple[type, ...] = ()
+    supports_local_infile = False
+
+    def connect(self):
+        raise NotImplementedError
+
+    def in_transaction(self, connection) -> bool:
+        raise NotImplementedError
+
+    def ping(self, connection):
+        connection.ping(reconnect=False)
+
+    def prepare_script(self, script: str) -> List[str]:
+        return split_sql_statements(script)
+
+    def close(self):
+        pass
+
+
+class MySQLBackend(DatabaseBackend):
+    name = 'mysql'
+    dict_cursor = pymysql.cursors.DictCursor
+    stream_cursor = pymysql.cursors.SSCursor
+    error = (pymysql.err.MySQLError,)
+    disconnect_errors = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+    supports_local_infile = True
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+
+    def connect(self):
+        return pymysql.connect(**self.config)
+
+    def in_transaction(self, connection) -> bool:
+        return bool(connection.server_status & SERVER_STATUS_IN_TRANS)
+
+
+def translate_placeholders(sql: str) -> str:
+    """
+    把 pymysql 风格的 %s 占位符转换为 sqlite3 的 ?，%% 转换为 %，忽略引号内的内容
+    """
+    out, i = [], 0
+    while i < len(sql):
+        char = sql[i]
+        if char in ("'", '"', '`'):
+            end = _quoted_end(sql, i)
+            out.append(sql[i:end])
+            i = end
+        elif sql.startswith('%s', i):
+            out.append('?')
+            i += 2
+        elif sql.startswith('%%', i):
+            out.append('%')
+            i += 2
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out)
+
+
+_COLUMN_COMMENT = re.compile(r"\s+COMMENT\s+'(?:[^'\\]|\\.|'')*'", re.IGNORECASE)
+_AUTO_INCREMENT_PK = re.compile(
+    r"^(`?\w+`?)\s+(?:BIG|SMALL|MEDIUM|TINY)?INT(?:EGER)?(?:\(\d+\))?(?:\s+UNSIGNED)?\s+"
+    r"(?:NOT NULL\s+)?PRIMARY KEY\s+AUTO_INCREMENT\b",
+    re.IGNORECASE,
+)
+_INDEX_DEF = re.compile(r"^(?:INDEX|KEY)\s+`?(\w+)`?\s*(\(.*\))$", re.IGNORECASE | re.DOTALL)
+_UNIQUE_DEF = re.compile(r"^UNIQUE\s+(?:KEY|INDEX)\s+`?\w+`?\s*(\(.*\))$", re.IGNORECASE | re.DOTALL)
+_CREATE_TABLE = re.compile(r"^CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\(", re.IGNORECASE)
+_SKIPPED_STATEMENTS = re.compile(r"^(SET|USE|LOCK|UNLOCK|ALTER\s+TABLE\s+\S+\s+AUTO_INCREMENT)\b", re.IGNORECASE)
+
+
+def translate_mysql_ddl(statement: str) -> List[str]:
+    """
+    把 MySQL 建表语句转换为 SQLite 可执行的语句: 去掉注释与表选项，自增主键改为 INTEGER PRIMARY KEY AUTOINCREMENT，
+    表内 INDEX/KEY 拆为独立的 CREATE INDEX（索引名加表名前缀，SQLite 中索引名全库唯一），UNIQUE KEY 改为 UNIQUE 约束
+    非建表语句原样返回，SET/USE 等 MySQL 会话语句直接忽略
+    """
+    if _SKIPPED_STATEMENTS.match(statement):
+        return []
+    match = _CREATE_TABLE.match(statement)
+    if not match:
+        return [statement]
+
+    if_not_exists, table = match.group(1) or '', match.group(2)
+    body_start = match.end()
+    body_end = statement.rindex(')')
+    columns, indexes = [], []
+    for definition in _split_top_level(statement[body_start:body_end]):
+        definition = _COLUMN_COMMENT.sub('', definition)
+        definition = re.sub(r"\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP(?:\(\))?", '', definition, flags=re.IGNORECASE)
+        definition = re.sub(r"\s+UNSIGNED\b", '', definition, flags=re.IGNORECASE)
+        index = _INDEX_DEF.match(definition)
+        if index:
+            indexes.append(f"CREATE INDEX {if_not_exists}{table}_{index.group(1)} ON {table} {index.group(2)}")
+            continue
+        unique = _UNIQUE_DEF.match(definition)
+        if unique:
+            columns.append(f"UNIQUE {unique.group(1)}")
+            continue
+        definition = _AUTO_INCREMENT_PK.sub(r"\1 INTEGER PRIMARY KEY AUTOINCREMENT", definition)
+        definition = re.sub(r"\s+AUTO_INCREMENT\b", '', definition, flags=re.IGNORECASE)
+        definition = re.sub(r"\bENUM\s*\([^)]*\)", 'TEXT', definition, flags=re.IGNORECASE)
+        columns.append(definition)
+
+    create = f"CREATE TABLE {if_not_exists}{table} (\n    " + ',\n    '.join(columns) + "\n)"
+    return [create] + indexes
+
+
+class _SQLiteCursor:
+    """
+    让 sqlite3 游标的用法与 pymysql 游标一致: execute 返回影响行数、支持 %s 占位符和字典行
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor, as_dict: bool):
+        self._cursor = cursor
+        self._as_dict = as_dict
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def _rows(self, rows: List[tuple]) -> List[Any]:
+        if not self._as_dict:
+            return rows
+        columns = [column[0] for column in self._cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def execute(self, sql: str, params: Optional[Union[Sequence[Any], Dict[str, Any]]] = None) -> int:
+        self._cursor.execute(translate_placeholders(sql), tuple(params) if isinstance(params, (list, tuple)) else (params or ()))
+        return max(self._cursor.rowcount, 0)
+
+    def executemany(self, sql: str, params_list: Sequence[Sequence[Any]]) -> int:
+        self._cursor.executemany(translate_placeholders(sql), [tuple(params) for params in params_list])
+        return max(self._cursor.rowcount, 0)
+
+    def fetchone(self) -> Any:
+        row = self._cursor.fetchone()
+        return None if row is None else self._rows([row])[0]
+
+    def fetchmany(self, size: int) -> List[Any]:
+        return self._rows(self._cursor.fetchmany(size))
+
+    def fetchall(self) -> List[Any]:
+        return self._rows(self._cursor.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _SQLiteConnection:
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def cursor(self, cursor_type: Any = None) -> _SQLiteCursor:
+        return _SQLiteCursor(self._connection.cursor(), as_dict=cursor_type == 'dict')
+
+    def begin(self):
+        self._connection.execute('BEGIN')
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def ping(self, reconnect: bool = False):
+        self._connection.execute('SELECT 1')
+
+    def close(self):
+        self._connection.close()
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._connection.in_transaction
+
+
+class SQLiteBackend(DatabaseBackend):
+    """
+    SQLite 后端，用于没有 MySQL 时离线运行数据库校验逻辑
+    :param database: 数据库文件路径，:memory: 表示进程内存库（同一 DatabaseHelper 的所有连接共享）
+    """
+    name = 'sqlite'
+    dict_cursor = 'dict'
+    stream_cursor = None
+    error = (sqlite3.Error,)
+
+    def __init__(self, database: Union[str, Path] = ':memory:', timeout: float = 30):
+        self.database = str(database)
+        self.timeout = timeout
+        self.memory = self.database == ':memory:'
+        self._uri = f"file:db_{uuid.uuid4().hex}?mode=memory&cache=shared" if self.memory else None
+        self._keeper: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        if self.memory:
+            connection = sqlite3.connect(self._uri, uri=True, timeout=self.timeout, check_same_thread=False)
+        else:
+            connection = sqlite3.connect(self.database, timeout=self.timeout, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA foreign_keys=ON')
+        return connection
+
+    def connect(self) -> _SQLiteConnection:
+        with self._lock:
+            # 共享内存库在最后一个连接关闭时被销毁，保留一个连接让数据在连接池回收连接后依然存在
+            if self.memory and self._keeper is None:
+                self._keeper = self._open()
+        return _SQLiteConnection(self._open())
+
+    def in_transaction(self, connection) -> bool:
+        return connection.in_transaction
+
+    def ping(self, connection):
+        connection.ping()
+
+    def prepare_script(self, script: str) -> List[str]:
+        statements = []
+        for statement in split_sql_statements(script):
+            statements.extend(translate_mysql_ddl(statement))
+        return statements
+
+    def close(self):
+        with self._lock:
+            if self._keeper is not None:
+                self._keeper.close()
+                self._keeper = None
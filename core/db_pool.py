@@ -0,0 +1,207 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional
+
+from pymysql.constants.SERVER_STATUS import SERVER_STATUS_IN_TRANS
+
+from core.logger import log
+
+
+@dataclass
+class PooledConnection:
+    connection: Any
+    created_at: float
+    last_used: float
+
+
+class ConnectionPool:
+    """
+    有界、线程安全的数据库连接池，借出时做健康检查，归还时回滚未结束的事务
+    :param connect: 无参调用，返回一个新的数据库连接
+    :param min_size: 首次使用时预建的连接数
+    :param max_size: 最大连接数（空闲 + 使用中），用尽时等待归还
+    :param max_lifetime: 连接最长存活秒数，到期后在借出或归还时关闭并按需重建
+    :param ping_interval: 连接空闲超过该秒数时借出前先 ping 检查，0 表示每次借出都检查
+    :param wait_timeout: 等待可用连接的超时时间
+    :param in_transaction: 判断连接是否处于未结束事务中，默认按 pymysql 连接判断
+    :param ping: 健康检查调用，默认 connection.ping(reconnect=False)
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        max_lifetime: float = 1800,
+        ping_interval: float = 30,
+        wait_timeout: float = 10,
+        in_transaction: Optional[Callable[[Any], bool]] = None,
+        ping: Optional[Callable[[Any], Any]] = None,
+    ):
+        self.connect = connect
+        self.in_transaction = in_transaction or (lambda connection: bool(connection.server_status & SERVER_STATUS_IN_TRANS))
+        self.ping = ping or (lambda connection: connection.ping(reconnect=False))
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        self.wait_timeout = wait_timeout
+
+        self._idle: Deque[PooledConnection] = deque()
+        self._cond = threading.Condition()
+        self._total = 0
+        self._in_use = 0
+        self._closed = False
+        self._prefilled = False
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "health_check_failures": 0,
+        }
+
+    def _new(self) -> PooledConnection:
+        connection = self.connect()
+        now = time.monotonic()
+        with self._cond:
+            self._stats["created"] += 1
+        return PooledConnection(connection, now, now)
+
+    def _close(self, pooled: PooledConnection):
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats["closed"] += 1
+
+    def _expired(self, pooled: PooledConnection) -> bool:
+        return bool(self.max_lifetime) and time.monotonic() - pooled.created_at > self.max_lifetime
+
+    def _healthy(self, pooled: PooledConnection) -> bool:
+        if time.monotonic() - pooled.last_used < self.ping_interval:
+            return True
+        try:
+            self.ping(pooled.connection)
+            return True
+        except Exception as e:
+            with self._cond:
+                self._stats["health_check_failures"] += 1
+            log.warning(f"数据库连接健康检查失败，重建连接: {e}")
+            return False
+
+    def _prefill(self):
+        with self._cond:
+            if self._prefilled:
+                return
+            self._prefilled = True
+            count = max(0, self.min_size - self._total)
+            self._total += count
+        for created in range(count):
+            try:
+                pooled = self._new()
+            except Exception:
+                with self._cond:
+                    self._total -= count - created
+                    self._cond.notify_all()
+                raise
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    def acquire(self) -> PooledConnection:
+        self._prefill()
+        started = time.monotonic()
+        deadline = started + self.wait_timeout
+        waited = False
+        pooled = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("数据库连接池已关闭")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._total < self.max_size:
+                    self._total += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"等待数据库连接超时({self.wait_timeout}s)，连接池上限 {self.max_size} 已全部被占用")
+                if not waited:
+                    waited = True
+                    self._stats["waits"] += 1
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            wait_time = time.monotonic() - started
+            self._stats["wait_time_total"] += wait_time
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], wait_time)
+
+        try:
+            if pooled is not None and (self._expired(pooled) or not self._healthy(pooled)):
+                self._close(pooled)
+                pooled = None
+            if pooled is None:
+                pooled = self._new()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return pooled
+
+    def release(self, pooled: PooledConnection, discard: bool = False):
+        """
+        :param discard: 连接已出错（如网络中断）时传 True，直接关闭不再复用
+        """
+        if not discard and self.in_transaction(pooled.connection):
+            # 只读查询也会开启事务快照，不回滚的话下次借出会读到旧数据
+            try:
+                pooled.connection.rollback()
+            except Exception:
+                discard = True
+
+        if discard or self._closed or self._expired(pooled):
+            self._close(pooled)
+            with self._cond:
+                self._total -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            return
+
+        pooled.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(pooled)
+            self._in_use -= 1
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._close(pooled)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            data: Dict[str, Any] = dict(self._stats, total=self._total, in_use=self._in_use, idle=len(self._idle))
+        data["wait_time_avg"] = data["wait_time_total"] / data["checkouts"] if data["checkouts"] else 0.0
+        return data
+
+    def log_stats(self):
+        data = self.stats()
+        log.info(
+            f"数据库连接池: 借出 {data['checkouts']} 次, 新建连接 {data['created']} 个, 关闭 {data['closed']} 个, "
+            f"等待 {data['waits']} 次(平均 {data['wait_time_avg'] * 1000:.2f}ms, 最长 {data['wait_time_max'] * 1000:.2f}ms), "
+            f"健康检查失败 {data['health_check_failures']} 次"
+        )
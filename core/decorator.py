@@ -1,9 +1,14 @@
+import asyncio
 import functools
 import random
 import time
-import allure
-from typing import Callable, Iterable, Optional, Tuple, Type
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Iterable, Optional, Tuple, Type
+from core.http_log_policy import http_log_policy
 from core.logger import log
+from core.metrics import latency_recorder
+from core.resilience import CircuitOpenError
 
 
 def retry(
@@ -14,6 +19,9 @@ def retry(
     backoff: str = "fixed",
     jitter: bool = False,
     max_delay: float = 10.0,
+    budget: Optional[Any] = None,
+    retry_on_status: Iterable[int] = (),
+    max_retry_after: float = 30.0,
 ):
     """
     重试装饰器
@@ -24,81 +32,227 @@ def retry(
     :param backoff: fixed 或 exponential
     :param jitter: 是否启用抖动
     :param max_delay: 单次sleep最大值（秒）
+    :param budget: 共享的重试预算（core.resilience.RetryBudget），预算耗尽时不再重试
+    :param retry_on_status: 返回这些状态码时也重试（如 429/503），优先按响应头 Retry-After 等待
+    :param max_retry_after: Retry-After 等待时间上限（秒）
     """
+    retry_statuses = frozenset(retry_on_status)
+
     def decorator(func: Callable):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            method = (kwargs.get('method') or (args[1] if len(args) > 1 else '') or '').upper()
-            if allowed_methods is not None:
-                allowed = {m.upper() for m in allowed_methods}
-                if method and method not in allowed:
-                    return func(*args, **kwargs)
+            if budget is not None:
+                budget.record_request()
+            if not _method_allowed(args, kwargs, allowed_methods):
+                return func(*args, **kwargs)
 
             attempts = 0
             while attempts < max_attempts:
                 try:
-                    return func(*args, **kwargs)
+                    result = func(*args, **kwargs)
                 except exceptions as e:
                     attempts += 1
                     if attempts >= max_attempts:
                         log.error(f"函数 {func.__name__} 执行失败，已重试 {max_attempts} 次: {str(e)}")
                         raise
+                    if budget is not None and not budget.try_acquire():
+                        log.error(f"重试预算已耗尽，函数 {func.__name__} 不再重试: {str(e)}")
+                        raise
                     log.warning(f"函数 {func.__name__} 执行失败，第 {attempts} 次重试: {str(e)}")
+                    time.sleep(_backoff_delay(attempts, delay, backoff, jitter, max_delay))
+                    continue
+
+                status_code = getattr(result, 'status_code', None)
+                if status_code not in retry_statuses:
+                    return result
+                attempts += 1
+                if attempts >= max_attempts or (budget is not None and not budget.try_acquire()):
+                    return result
+                sleep_s = _status_retry_delay(result, attempts, delay, backoff, jitter, max_delay, max_retry_after)
+                log.warning(f"函数 {func.__name__} 返回状态码 {status_code}，{sleep_s:.2f}s 后第 {attempts} 次重试")
+                time.sleep(sleep_s)
+            return None
+        return wrapper
+    return decorator
+
+
+def async_retry(
+    max_attempts: int = 3,
+    delay: float = 1.0,
+    exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+    allowed_methods: Optional[Iterable[str]] = None,
+    backoff: str = "fixed",
+    jitter: bool = False,
+    max_delay: float = 10.0,
+    budget: Optional[Any] = None,
+    retry_on_status: Iterable[int] = (),
+    max_retry_after: float = 30.0,
+):
+    """
+    协程版重试装饰器，参数与 retry 一致，等待期间不阻塞事件循环
+    """
+    retry_statuses = frozenset(retry_on_status)
 
-                    if backoff == "exponential":
-                        sleep_s = min(max_delay, delay * (2 ** (attempts - 1)))
-                    else:
-                        sleep_s = min(max_delay, delay)
+    def decorator(func: Callable):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if budget is not None:
+                budget.record_request()
+            if not _method_allowed(args, kwargs, allowed_methods):
+                return await func(*args, **kwargs)
 
-                    if jitter:
-                        sleep_s = random.uniform(0, sleep_s)
+            attempts = 0
+            while attempts < max_attempts:
+                try:
+                    result = await func(*args, **kwargs)
+                except exceptions as e:
+                    attempts += 1
+                    if attempts >= max_attempts:
+                        log.error(f"函数 {func.__name__} 执行失败，已重试 {max_attempts} 次: {str(e)}")
+                        raise
+                    if budget is not None and not budget.try_acquire():
+                        log.error(f"重试预算已耗尽，函数 {func.__name__} 不再重试: {str(e)}")
+                        raise
+                    log.warning(f"函数 {func.__name__} 执行失败，第 {attempts} 次重试: {str(e)}")
+                    await asyncio.sleep(_backoff_delay(attempts, delay, backoff, jitter, max_delay))
+                    continue
 
-                    time.sleep(sleep_s)
+                status_code = getattr(result, 'status_code', None)
+                if status_code not in retry_statuses:
+                    return result
+                attempts += 1
+                if attempts >= max_attempts or (budget is not None and not budget.try_acquire()):
+                    return result
+                sleep_s = _status_retry_delay(result, attempts, delay, backoff, jitter, max_delay, max_retry_after)
+                log.warning(f"函数 {func.__name__} 返回状态码 {status_code}，{sleep_s:.2f}s 后第 {attempts} 次重试")
+                await asyncio.sleep(sleep_s)
             return None
         return wrapper
     return decorator
 
 
+def _method_allowed(args: tuple, kwargs: dict, allowed_methods: Optional[Iterable[str]]) -> bool:
+    if allowed_methods is None:
+        return True
+    method = (kwargs.get('method') or (args[1] if len(args) > 1 else '') or '').upper()
+    allowed = {m.upper() for m in allowed_methods}
+    return not method or method in allowed
+
+
+def _backoff_delay(attempts: int, delay: float, backoff: str, jitter: bool, max_delay: float) -> float:
+    if backoff == "exponential":
+        sleep_s = min(max_delay, delay * (2 ** (attempts - 1)))
+    else:
+        sleep_s = min(max_delay, delay)
+
+    if jitter:
+        sleep_s = random.uniform(0, sleep_s)
+    return sleep_s
+
+
+def retry_after_seconds(response) -> Optional[float]:
+    """
+    解析 Retry-After 响应头，支持秒数与HTTP日期两种格式
+    """
+    value = (getattr(response, 'headers', None) or {}).get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _status_retry_delay(
+    response,
+    attempts: int,
+    delay: float,
+    backoff: str,
+    jitter: bool,
+    max_delay: float,
+    max_retry_after: float,
+) -> float:
+    retry_after = retry_after_seconds(response)
+    if retry_after is not None:
+        return min(retry_after, max_retry_after)
+    return _backoff_delay(attempts, delay, backoff, jitter, max_delay)
+
+
 def log_request_response(func: Callable):
     """
     记录请求和响应的装饰器
     """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        method = kwargs.get('method', args[1] if len(args) > 1 else 'UNKNOWN')
-        endpoint = kwargs.get('endpoint', args[2] if len(args) > 2 else '')
-        
-        log.info(f"发送请求: {method} {endpoint}")
-        log.debug(f"请求参数: {kwargs}")
-        
+        method, endpoint = _request_target(args, kwargs)
+        _log_request(method, endpoint, kwargs)
+
         start_time = time.time()
         try:
             response = func(*args, **kwargs)
-            elapsed_time = time.time() - start_time
-            
-            log.info(f"响应状态码: {response.status_code}, 耗时: {elapsed_time:.3f}s")
-            log.debug(f"响应内容: {response.text[:500]}")
-            
-            with allure.step(f"{method} {endpoint}"):
-                allure.attach(
-                    f"{method} {endpoint}\n参数: {kwargs}",
-                    name="请求信息",
-                    attachment_type=allure.attachment_type.TEXT
-                )
-                allure.attach(
-                    f"状态码: {response.status_code}\n耗时: {elapsed_time:.3f}s\n响应: {response.text}",
-                    name="响应信息",
-                    attachment_type=allure.attachment_type.TEXT
-                )
-            
+            _log_response(method, endpoint, kwargs, response, time.time() - start_time)
             return response
         except Exception as e:
-            elapsed_time = time.time() - start_time
-            log.error(f"请求失败: {method} {endpoint}, 耗时: {elapsed_time:.3f}s, 错误: {str(e)}")
+            _log_failure(method, endpoint, e, time.time() - start_time)
+            raise
+    return wrapper
+
+
+def async_log_request_response(func: Callable):
+    """
+    协程版请求/响应日志装饰器
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        method, endpoint = _request_target(args, kwargs)
+        _log_request(method, endpoint, kwargs)
+
+        start_time = time.time()
+        try:
+            response = await func(*args, **kwargs)
+            _log_response(method, endpoint, kwargs, response, time.time() - start_time)
+            return response
+        except Exception as e:
+            _log_failure(method, endpoint, e, time.time() - start_time)
             raise
     return wrapper
 
 
+def _request_target(args: tuple, kwargs: dict) -> Tuple[str, str]:
+    method = kwargs.get('method', args[1] if len(args) > 1 else 'UNKNOWN')
+    endpoint = kwargs.get('endpoint', args[2] if len(args) > 2 else '')
+    return method, endpoint
+
+
+def _log_request(method: str, endpoint: str, kwargs: dict):
+    http_log_policy.log_request(method, endpoint, kwargs)
+
+
+def _log_response(method: str, endpoint: str, kwargs: dict, response, elapsed_time: float):
+    # 缓存命中的响应没有发出请求，耗时接近 0，计入会拉低延迟分布和回归基线
+    if not getattr(response, 'from_cache', False):
+        latency_recorder.record(method, endpoint, elapsed_time, failed=response.status_code >= 500)
+        timing = getattr(response, 'timing', None)
+        if timing is not None:
+            latency_recorder.record_timing(method, endpoint, timing)
+    http_log_policy.log_response(method, endpoint, kwargs, response, elapsed_time)
+
+
+def _log_failure(method: str, endpoint: str, error: Exception, elapsed_time: float):
+    if isinstance(error, CircuitOpenError):
+        log.error(f"请求被熔断: {method} {endpoint}, {str(error)}")
+        return
+    latency_recorder.record(method, endpoint, elapsed_time, failed=True)
+    log.error(f"请求失败: {method} {endpoint}, 耗时: {elapsed_time:.3f}s, 错误: {str(error)}")
+
+
 def performance_monitor(threshold=3.0):
     """
     性能监控装饰器
@@ -0,0 +1,115 @@
+import math
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from config.settings import settings
+from core.logger import log
+
+
+class EntityPool:
+    """
+    测试实体预创建池: 会话 fixture 中调用 prefill 按预计用量并发批量创建，每个测试租用一个全新实体（不复用），
+    用完后按 batch_size 补充，会话结束时统一并发删除所有创建过的实体
+    :param api: 用于并发调用的 BaseAPI 实例（使用其 gather）
+    :param create: 无参调用，返回创建接口的响应
+    :param delete: 按ID删除实体的调用
+    :param expected: 本进程预计租用次数，不足时按 batch_size 补充
+    :param registry: 传入 EntityRegistry 时清理改为登记到 table，由其在会话结束统一批量删库
+    """
+
+    def __init__(
+        self,
+        name: str,
+        api,
+        create: Callable[[], Any],
+        delete: Callable[[Any], Any],
+        expected: int = 0,
+        batch_size: int = 20,
+        max_workers: int = 8,
+        id_field: str = 'id',
+        created_status: int = 201,
+        table: Optional[str] = None,
+        registry=None,
+    ):
+        self.name = name
+        self.api = api
+        self.create = create
+        self.delete = delete
+        self.expected = expected
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.id_field = id_field
+        self.created_status = created_status
+        self.table = table
+        self.registry = registry
+
+        self.available: Deque[Dict[str, Any]] = deque()
+        self.created: List[Any] = []
+        self.leased = 0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        count = max(1, min(self.batch_size, self.expected - self.leased))
+        results = self.api.gather(*[self.create] * count, max_workers=self.max_workers)
+        for result in results:
+            if result.ok and result.response.status_code == self.created_status:
+                entity = result.response.json()
+                if isinstance(entity, dict) and entity.get(self.id_field) is not None:
+                    self.available.append(entity)
+                    self.created.append(entity[self.id_field])
+                    continue
+                log.error(f"创建{self.name}的响应中没有 {self.id_field}，按创建失败处理: {result.response.text[:200]}")
+            else:
+                detail = result.error if result.error is not None else result.response.text
+                log.error(f"批量创建{self.name}失败: {detail}")
+        log.info(f"{self.name}池补充 {len(self.available)}/{count} 个，累计创建 {len(self.created)} 个")
+
+    def prefill(self):
+        """
+        在会话开始时预先创建第一批实体，避免创建耗时落在首个租用的测试上
+        """
+        with self._lock:
+            if not self.available and self.expected > self.leased:
+                self._refill()
+
+    def lease(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if not self.available:
+                self._refill()
+            if not self.available:
+                return None
+            self.leased += 1
+            return self.available.popleft()
+
+    def cleanup(self):
+        with self._lock:
+            ids, self.created = self.created, []
+            self.available.clear()
+        if not ids:
+            return
+        if self.registry is not None and self.table:
+            for entity_id in ids:
+                self.registry.track(self.table, entity_id)
+            return
+        results = self.api.gather(*[(self.delete, entity_id) for entity_id in ids], max_workers=self.max_workers)
+        failed = [entity_id for entity_id, result in zip(ids, results) if not result.ok or result.response.status_code >= 400]
+        log.info(f"清理测试{self.name}: 共 {len(ids)} 个, 失败 {len(failed)} 个")
+        if failed:
+            log.warning(f"以下{self.name}清理失败: {failed}")
+
+
+def expected_per_worker(total: int) -> int:
+    """
+    xdist 下每个 worker 都会收集全部用例，按 worker 数平均估算本进程用量，不足部分运行时再补充
+    """
+    workers = int(os.getenv('PYTEST_XDIST_WORKER_COUNT', 1) or 1)
+    return math.ceil(total / workers)
+
+
+def entity_pool_enabled() -> bool:
+    value = os.getenv('ENTITY_POOL')
+    if value is not None:
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(settings.entity_pool_config.get('enabled', False))
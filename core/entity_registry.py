@@ -0,0 +1,76 @@
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config.settings import settings
+from core.logger import log
+
+
+class EntityRegistry:
+    """
+    测试数据登记表: 会话内通过接口创建的数据只登记ID，会话结束时在一个事务内按表批量删除
+    （每张表每 chunk_size 个ID一条 DELETE ... IN），代替逐个调用删除接口
+    :param cascades: 表 -> [(子表, 外键列)]，删除主表记录前先删除子表中引用它们的记录
+    """
+
+    CASCADES: Dict[str, List[Tuple[str, str]]] = {
+        'coupons': [('user_coupons', 'coupon_id')],
+        'activities': [('activity_participants', 'activity_id')],
+        'users': [('user_coupons', 'user_id'), ('activity_participants', 'user_id')],
+    }
+
+    def __init__(self, db_helper, chunk_size: int = 1000, cascades: Optional[Dict[str, List[Tuple[str, str]]]] = None):
+        self.db_helper = db_helper
+        self.chunk_size = chunk_size
+        self.cascades = self.CASCADES if cascades is None else cascades
+        self._tracked: Dict[str, Set[Any]] = {}
+        self._lock = threading.Lock()
+
+    def track(self, table: str, entity_id: Any):
+        with self._lock:
+            self._tracked.setdefault(table, set()).add(entity_id)
+
+    def _delete(self, cursor, table: str, column: str, ids: List[Any]) -> int:
+        deleted = 0
+        for start in range(0, len(ids), self.chunk_size):
+            chunk = ids[start:start + self.chunk_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            deleted += cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", tuple(chunk))
+        return deleted
+
+    def flush(self) -> Dict[str, int]:
+        """
+        删除所有登记的数据，返回各表删除行数；失败时整体回滚并保留登记，便于排查
+        """
+        with self._lock:
+            tracked, self._tracked = self._tracked, {}
+        if not tracked:
+            return {}
+
+        deleted: Dict[str, int] = {}
+        with self.db_helper.get_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    for table, ids in tracked.items():
+                        ids = sorted(ids)
+                        for child, column in self.cascades.get(table, []):
+                            deleted[child] = deleted.get(child, 0) + self._delete(cursor, child, column, ids)
+                        deleted[table] = deleted.get(table, 0) + self._delete(cursor, table, 'id', ids)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                with self._lock:
+                    for table, ids in tracked.items():
+                        self._tracked.setdefault(table, set()).update(ids)
+                log.error(f"批量清理测试数据失败: {str(e)}, 未清理: { {t: len(i) for t, i in tracked.items()} }")
+                return {}
+        log.info(f"批量清理测试数据: {deleted}")
+        return deleted
+
+
+def db_cleanup_enabled() -> bool:
+    """
+    TEST_DATA_CLEANUP=db 或 entity_pool.cleanup 配置为 db 时，测试数据改为会话结束直接批量删库
+    """
+    value = os.getenv('TEST_DATA_CLEANUP') or settings.entity_pool_config.get('cleanup', 'api')
+    return str(value).lower() == 'db'
@@ -1,9 +1,76 @@
+import functools
+import time
 import requests
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
 from requests.exceptions import RequestException
 
+from core.cassette import cassette_library
 from core.decorator import log_request_response, retry
+from core.json_codec import CachedJsonResponse, encode_json
 from core.logger import log
+from core.network_timing import TimedHTTPAdapter, attach_timing
+from core.resilience import HedgePolicy, circuit_breakers, retry_budget
+from core.response_cache import CONDITIONAL_HEADERS, ResponseCache
+
+RequestSpec = Union[Dict[str, Any], Tuple]
+
+
+@dataclass
+class BatchResult:
+    index: int
+    method: str
+    endpoint: str
+    response: Optional[requests.Response] = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_concurrently(
+    calls: Sequence[Tuple[str, str, Callable[[], Any]]],
+    max_workers: int = 8,
+) -> List[BatchResult]:
+    """
+    在有界线程池中并发执行调用，结果按输入顺序返回
+    :param calls: (method, endpoint, 无参可调用对象) 列表
+    :param max_workers: 最大并发线程数
+    """
+    jobs = [(BatchResult(index=i, method=method, endpoint=endpoint), call) for i, (method, endpoint, call) in enumerate(calls)]
+    return execute_concurrently(jobs, max_workers=max_workers)
+
+
+def execute_concurrently(jobs: Sequence[Tuple[Any, Callable[[], Any]]], max_workers: int = 8) -> List[Any]:
+    """
+    并发执行 (结果对象, 无参可调用对象) 列表，把响应、异常与耗时写入对应的结果对象，结果按输入顺序返回
+    结果对象需有 response / error / elapsed / ok 属性，如 BatchResult
+    """
+    def _invoke(result: Any, call: Callable[[], Any]) -> Any:
+        start_time = time.time()
+        try:
+            result.response = call()
+        except Exception as e:
+            result.error = e
+        result.elapsed = time.time() - start_time
+        return result
+
+    if not jobs:
+        return []
+
+    # 每批次使用新的线程池，保证 allure 步骤挂到当前用例上
+    workers = max(1, min(max_workers, len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http-batch") as executor:
+        futures = [executor.submit(_invoke, result, call) for result, call in jobs]
+        results = [future.result() for future in futures]
+
+    failed = sum(1 for r in results if not r.ok)
+    log.info(f"并发请求完成: 共 {len(results)} 个, 失败 {failed} 个")
+    return results
 
 
 class HttpClient:
@@ -13,14 +80,28 @@ class HttpClient:
         timeout: int = 30,
         token: Optional[str] = None,
         use_session: bool = True,
+        pool_maxsize: int = 10,
+        hedge: Optional[HedgePolicy] = None,
+        cache: Optional[ResponseCache] = None,
     ):
+        """
+        :param hedge: 对冲请求策略，仅对 GET/HEAD 生效，默认关闭
+        :param cache: 只读接口响应缓存，默认关闭
+        """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
         self.use_session = use_session
+        self.pool_maxsize = pool_maxsize
+        self.hedge = hedge
+        self.cache = cache
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
 
         self.session: Optional[requests.Session] = None
         if self.use_session:
             self.session = requests.Session()
+            adapter = TimedHTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
             self.session.headers.update({
                 'Content-Type': 'application/json',
                 'User-Agent': 'Automated-Test-Framework/1.0'
@@ -53,24 +134,109 @@ class HttpClient:
         backoff="exponential",
         jitter=True,
         max_delay=5.0,
+        budget=retry_budget,
+        retry_on_status=(429, 503),
     )
     @log_request_response
     def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
         url = f"{self.base_url}{endpoint}" if not endpoint.startswith('http') else endpoint
         kwargs.setdefault('timeout', self.timeout)
 
-        headers = kwargs.get('headers') or {}
+        headers = dict(kwargs.get('headers') or {})
         headers.setdefault('Content-Type', 'application/json')
         headers.setdefault('User-Agent', 'Automated-Test-Framework/1.0')
         kwargs['headers'] = headers
 
+        if kwargs.get('json') is not None and not kwargs.get('data'):
+            kwargs['data'] = encode_json(kwargs.pop('json'))
+
+        cache_key, cache_ttl = None, None
+        if self.cache is not None:
+            cache_ttl = self.cache.ttl_for(method, url)
+            if cache_ttl is None and method.upper() not in ('GET', 'HEAD', 'OPTIONS'):
+                self.cache.invalidate(url)
+            elif cache_ttl is not None and not any(h in headers for h in CONDITIONAL_HEADERS):
+                authorization = headers.get('Authorization') or (self.session.headers.get('Authorization') if self.session else None)
+                cache_key = self.cache.key(url, kwargs, authorization)
+                cached = self.cache.lookup(cache_key, headers)
+                if cached is not None:
+                    return cached
+
+        cassette = cassette_library.current
+        if cassette is not None and cassette.mode == 'replay':
+            response = cassette.replay(method, url, kwargs)
+            response.__class__ = CachedJsonResponse
+            return response
+
+        breaker = circuit_breakers.get(urlparse(url).netloc)
+        if breaker is not None:
+            breaker.before_call()
+
+        response, error = None, None
         try:
-            if self.use_session and self.session:
-                return self.session.request(method, url, **kwargs)
-            return requests.request(method, url, **kwargs)
-        except RequestException as e:
-            log.error(f"请求异常: {method} {url}, 错误: {str(e)}")
+            if self.hedge is not None and self.hedge.applies_to(method):
+                response = self._send_hedged(method, endpoint, url, kwargs)
+            else:
+                response = self._send(method, url, kwargs)
+        except BaseException as e:
+            error = e
+            if isinstance(e, RequestException):
+                log.error(f"请求异常: {method} {url}, 错误: {str(e)}")
             raise
+        finally:
+            if breaker is not None:
+                breaker.record_outcome(
+                    response.status_code if response is not None else None,
+                    transport_error=isinstance(error, (requests.ConnectionError, requests.Timeout)),
+                )
+
+        if cassette is not None:
+            cassette.record(method, url, kwargs, response)
+
+        if type(response) is requests.Response:
+            response.__class__ = CachedJsonResponse
+        if cache_key is not None:
+            stored = self.cache.store(cache_key, cache_ttl, response)
+            if stored is None:
+                for header in CONDITIONAL_HEADERS:
+                    headers.pop(header, None)
+                response = self._send(method, url, kwargs)
+                if type(response) is requests.Response:
+                    response.__class__ = CachedJsonResponse
+                stored = self.cache.store(cache_key, cache_ttl, response)
+            response = stored or response
+        return response
+
+    def _send(self, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        if self.use_session and self.session:
+            response = self.session.request(method, url, **kwargs)
+            attach_timing(response, time.perf_counter())
+            return response
+        return requests.request(method, url, **kwargs)
+
+    def _send_hedged(self, method: str, endpoint: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(max_workers=self.pool_maxsize * 2, thread_name_prefix="http-hedge")
+
+        delay = self.hedge.delay_for(method, endpoint)
+        primary = self._hedge_executor.submit(self._send, method, url, kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        log.info(f"请求超过 {delay:.3f}s 未返回，发起对冲请求: {method} {endpoint}")
+        backup = self._hedge_executor.submit(self._send, method, url, kwargs)
+        error: Optional[BaseException] = None
+        for future in as_completed([primary, backup]):
+            try:
+                response = future.result()
+            except RequestException as e:
+                error = e
+                continue
+            self.hedge.record(hedge_won=future is backup)
+            return response
+        self.hedge.record(hedge_won=False)
+        raise error
 
     def get(self, endpoint: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
         return self.request('GET', endpoint, params=params, **kwargs)
@@ -105,7 +271,30 @@ class HttpClient:
     ) -> requests.Response:
         return self.request('PATCH', endpoint, data=data, json=json, **kwargs)
 
+    def batch(self, specs: Sequence[RequestSpec], max_workers: Optional[int] = None) -> List[BatchResult]:
+        """
+        并发执行一组相互独立的请求，复用同一会话连接池，重试与日志语义与 request 一致
+        :param specs: {"method": "GET", "endpoint": "/api/v1/coupons/1", "params": {...}} 或 (method, endpoint[, kwargs])
+        :param max_workers: 最大并发数，默认不超过连接池大小
+        """
+        calls = []
+        for spec in specs:
+            if isinstance(spec, dict):
+                kwargs = dict(spec)
+                method = kwargs.pop('method', 'GET').upper()
+                endpoint = kwargs.pop('endpoint')
+            else:
+                method, endpoint = spec[0].upper(), spec[1]
+                kwargs = dict(spec[2]) if len(spec) > 2 else {}
+            calls.append((method, endpoint, functools.partial(self.request, method, endpoint, **kwargs)))
+        return run_concurrently(calls, max_workers=max_workers or self.pool_maxsize)
+
     def close(self):
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+            self._hedge_executor = None
+        if self.cache is not None:
+            self.cache.log_stats()
         if self.session:
             self.session.close()
         log.info("HTTP会话已关闭")
@@ -0,0 +1,165 @@
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import allure
+
+from config.settings import settings
+from core.logger import log, logger_manager
+
+TEXT_CONTENT_TYPES = ('json', 'text', 'xml', 'html', 'javascript', 'x-www-form-urlencoded')
+ATTACH_MODES = ('always', 'on_failure', 'never')
+
+
+class HttpLogPolicy:
+    """
+    请求/响应日志与Allure附件策略
+    :param max_log_bytes: DEBUG日志中响应体最多保留的字节数
+    :param max_attach_bytes: 单个附件中响应体最多保留的字节数，超出部分按首尾采样
+    :param attach_mode: always 每次请求都附加 / on_failure 仅用例失败时附加（缓存截断后的文本，不持有响应对象） / never 不附加
+    :param test_budget_bytes: 单个用例附件总字节上限，0表示不限制
+    """
+
+    def __init__(
+        self,
+        max_log_bytes: int = 500,
+        max_attach_bytes: int = 64 * 1024,
+        attach_mode: str = 'always',
+        test_budget_bytes: int = 5 * 1024 * 1024,
+    ):
+        if attach_mode not in ATTACH_MODES:
+            raise ValueError(f"attach_mode 仅支持 {ATTACH_MODES}, 实际: {attach_mode}")
+        self.max_log_bytes = max_log_bytes
+        self.max_attach_bytes = max_attach_bytes
+        self.attach_mode = attach_mode
+        self.test_budget_bytes = test_budget_bytes
+
+        self._lock = threading.Lock()
+        self._used_bytes = 0
+        self._budget_exhausted = False
+        self._pending: List[Tuple[str, str]] = []
+        self._pending_bytes = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "HttpLogPolicy":
+        return cls(
+            max_log_bytes=int(os.getenv('HTTP_LOG_MAX_LOG_BYTES', config.get('max_log_bytes', 500))),
+            max_attach_bytes=int(os.getenv('HTTP_LOG_MAX_ATTACH_BYTES', config.get('max_attach_bytes', 64 * 1024))),
+            attach_mode=os.getenv('HTTP_LOG_ATTACH_MODE', config.get('attach_mode', 'always')),
+            test_budget_bytes=int(os.getenv('HTTP_LOG_TEST_BUDGET_BYTES', config.get('test_budget_bytes', 5 * 1024 * 1024))),
+        )
+
+    @staticmethod
+    def is_text(content_type: str) -> bool:
+        content_type = (content_type or '').lower()
+        return not content_type or any(t in content_type for t in TEXT_CONTENT_TYPES)
+
+    @staticmethod
+    def truncate(text: str, limit: int) -> str:
+        if limit <= 0 or len(text) <= limit:
+            return text
+        head = limit * 3 // 4
+        tail = limit - head
+        return f"{text[:head]}\n...（省略 {len(text) - limit} 字符）...\n{text[-tail:]}"
+
+    def render_body(self, response, limit: Optional[int] = None) -> str:
+        """
+        只解码需要展示的部分响应体，二进制内容仅输出摘要
+        """
+        limit = self.max_attach_bytes if limit is None else limit
+        content = response.content or b''
+        content_type = response.headers.get('Content-Type', '')
+        if not self.is_text(content_type):
+            return f"<二进制内容 {len(content)} bytes, {content_type}>"
+
+        encoding = response.encoding or 'utf-8'
+        if limit <= 0 or len(content) <= limit:
+            return content.decode(encoding, errors='replace')
+
+        head = limit * 3 // 4
+        tail = limit - head
+        return (
+            f"{content[:head].decode(encoding, errors='replace')}\n"
+            f"...（省略 {len(content) - limit} 字节，共 {len(content)} 字节）...\n"
+            f"{content[-tail:].decode(encoding, errors='replace')}"
+        )
+
+    def render_params(self, kwargs: Dict[str, Any]) -> str:
+        return self.truncate(str(kwargs), self.max_attach_bytes)
+
+    def start_test(self):
+        with self._lock:
+            self._used_bytes = 0
+            self._budget_exhausted = False
+            self._pending = []
+            self._pending_bytes = 0
+
+    def attach(self, render: Callable[[], str], name: str):
+        """
+        :param render: 生成附件内容的函数，on_failure 模式下立即生成截断后的文本缓存，用例失败时才附加
+        """
+        if self.attach_mode == 'never':
+            return
+        if self.attach_mode == 'on_failure':
+            with self._lock:
+                # 超出单用例附件预算的部分失败时也不会附加，不必缓存
+                if self.test_budget_bytes and self._pending_bytes > self.test_budget_bytes:
+                    return
+            content = render()
+            with self._lock:
+                self._pending.append((content, name))
+                self._pending_bytes += len(content)
+            return
+        self._attach(render(), name)
+
+    def _attach(self, content: str, name: str):
+        with self._lock:
+            size = len(content.encode('utf-8'))
+            if self.test_budget_bytes and self._used_bytes + size > self.test_budget_bytes:
+                if self._budget_exhausted:
+                    return
+                self._budget_exhausted = True
+                content = f"本用例附件已达上限 {self.test_budget_bytes} 字节，后续请求不再附加"
+                name = "附件预算已用尽"
+            else:
+                self._used_bytes += size
+
+        allure.attach(content, name=name, attachment_type=allure.attachment_type.TEXT)
+
+    def flush_pending(self):
+        """
+        on_failure 模式下，用例失败时补充附加本用例缓存的请求信息
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._pending_bytes = 0
+        for content, name in pending:
+            self._attach(content, name)
+
+    def log_request(self, method: str, endpoint: str, kwargs: Dict[str, Any]):
+        log.info(f"发送请求: {method} {endpoint}")
+        if logger_manager.enabled("DEBUG"):
+            log.debug(f"请求参数: {self.truncate(str(kwargs), self.max_log_bytes)}")
+
+    def log_response(self, method: str, endpoint: str, kwargs: Dict[str, Any], response, elapsed_time: float):
+        log.info(f"响应状态码: {response.status_code}, 耗时: {elapsed_time:.3f}s")
+        if logger_manager.enabled("DEBUG"):
+            log.debug(f"响应内容: {self.render_body(response, self.max_log_bytes)}")
+
+        if self.attach_mode == 'never':
+            return
+
+        def render() -> str:
+            return (
+                f"{method} {endpoint}\n参数: {self.render_params(kwargs)}\n\n"
+                f"状态码: {response.status_code}\n耗时: {elapsed_time:.3f}s\n响应: {self.render_body(response)}"
+            )
+
+        if self.attach_mode == 'on_failure':
+            self.attach(render, name=f"{method} {endpoint}")
+            return
+        with allure.step(f"{method} {endpoint}"):
+            self.attach(render, name="请求响应信息")
+
+
+http_log_policy = HttpLogPolicy.from_config(settings.http_log_config)
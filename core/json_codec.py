@@ -0,0 +1,110 @@
+import json
+import os
+import re
+from typing import Any, Union
+
+import requests
+
+from core.logger import log
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 运行环境未安装orjson时降级
+    orjson = None
+
+_MISSING = object()
+_LONG_DIGITS = re.compile(rb'\d{19,}')
+_LONG_DIGITS_TEXT = re.compile(r'\d{19,}')
+_UTF8_ENCODINGS = ('utf-8', 'utf8', 'ascii', 'us-ascii')
+
+
+class StdlibJsonCodec:
+    name = "stdlib"
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        # 与 requests 一致，NaN/Infinity 不是合法JSON，直接报错而不是发出服务端无法解析的请求体
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), allow_nan=False).encode('utf-8')
+
+    @staticmethod
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    name = "orjson"
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return StdlibJsonCodec.dumps(obj)
+
+    @staticmethod
+    def loads(data: Union[bytes, str]) -> Any:
+        # orjson 会把超出64位的整数静默转为浮点数，可能含大整数时交给标准库保留精度
+        pattern = _LONG_DIGITS_TEXT if isinstance(data, str) else _LONG_DIGITS
+        if pattern.search(data):
+            return StdlibJsonCodec.loads(data)
+        return orjson.loads(data)
+
+
+def get_codec(name: str = "auto"):
+    """
+    :param name: auto（优先orjson）/ orjson / stdlib
+    """
+    name = (name or "auto").lower()
+    if name == "stdlib":
+        return StdlibJsonCodec()
+    if orjson is None:
+        if name == "orjson":
+            log.warning("未安装 orjson，JSON编解码降级为标准库")
+        return StdlibJsonCodec()
+    return OrjsonCodec()
+
+
+json_codec = get_codec(os.getenv('JSON_CODEC', 'auto'))
+
+
+def set_codec(name: str):
+    global json_codec
+    json_codec = get_codec(name)
+    log.info(f"JSON编解码器已切换: {json_codec.name}")
+
+
+def encode_json(obj: Any) -> bytes:
+    return json_codec.dumps(obj)
+
+
+def parse_json(response) -> Any:
+    """
+    解析响应体JSON并缓存在响应对象上，同一响应只解析一次
+    注意: 返回的是共享对象，修改它会影响后续断言
+    """
+    cached = getattr(response, '_json_cache', _MISSING)
+    if cached is not _MISSING:
+        return cached
+
+    encoding = getattr(response, 'encoding', None)
+    if encoding and encoding.lower() not in _UTF8_ENCODINGS:
+        # 响应声明了非UTF-8字符集（如GBK），按字符集解码后再解析
+        data = json_codec.loads(response.text)
+    else:
+        data = json_codec.loads(response.content)
+    try:
+        response._json_cache = data
+    except AttributeError:
+        pass
+    return data
+
+
+class CachedJsonResponse(requests.Response):
+    """
+    HttpClient 返回的响应类型，json() 使用可插拔编解码器且只解析一次
+    """
+
+    def json(self, **kwargs):
+        if kwargs:
+            return super().json(**kwargs)
+        return parse_json(self)
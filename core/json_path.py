@@ -0,0 +1,159 @@
+import json
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+MISSING = object()
+
+_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>=': operator.ge,
+    '<=': operator.le,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+_FILTER = re.compile(r'^\?\s*([\w.]+)\s*(==|!=|>=|<=|>|<)\s*(.+?)\s*$')
+_SEGMENT = re.compile(r'([^\[\]]+)|\[([^\]]*)\]')
+
+
+def _literal(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text.strip('\'"')
+
+
+def _tokenize(path: str) -> List[str]:
+    tokens, depth, current = [], 0, ''
+    for char in path:
+        if char == '.' and depth == 0:
+            tokens.append(current)
+            current = ''
+            continue
+        depth += char == '['
+        depth -= char == ']'
+        current += char
+    tokens.append(current)
+    return [token for token in tokens if token != '']
+
+
+def _parse_step(token: str) -> Tuple:
+    if token == '*':
+        return ('wildcard',)
+    if token.startswith('?'):
+        match = _FILTER.match(token)
+        if not match:
+            raise ValueError(f"无法解析过滤条件: [{token}]")
+        field, op, value = match.groups()
+        return ('filter', field, op, _literal(value))
+    if re.fullmatch(r'-?\d+', token):
+        return ('index', int(token))
+    return ('key', token)
+
+
+class CompiledPath:
+    """
+    已编译的字段路径，语法:
+    data.items.0.id / data.items[0].id  列表下标
+    data.items.*.id / data.items[*].id  通配，返回所有匹配值组成的列表
+    data.items[?status==active].id       过滤，支持 == != > < >= <=
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.steps: Tuple[Tuple, ...] = tuple(self._compile(path))
+        self.multi = any(step[0] in ('wildcard', 'filter') for step in self.steps)
+
+    @staticmethod
+    def _compile(path: str) -> Iterable[Tuple]:
+        for token in _tokenize(path):
+            for name, bracket in _SEGMENT.findall(token):
+                yield _parse_step(name if name else bracket.strip())
+
+    def find(self, data: Any) -> List[Any]:
+        values = [data]
+        for step in self.steps:
+            values = [child for value in values for child in apply_step(step, value)]
+        return values
+
+    def get(self, data: Any, default: Any = MISSING) -> Any:
+        values = self.find(data)
+        if self.multi:
+            return values
+        if values:
+            return values[0]
+        if default is not MISSING:
+            return default
+        raise KeyError(f"字段 {self.path} 不存在")
+
+
+def apply_step(step: Tuple, value: Any) -> List[Any]:
+    kind = step[0]
+    if kind == 'key':
+        if isinstance(value, dict) and step[1] in value:
+            return [value[step[1]]]
+        return []
+    if kind == 'index':
+        if isinstance(value, list):
+            try:
+                return [value[step[1]]]
+            except IndexError:
+                return []
+        if isinstance(value, dict) and str(step[1]) in value:
+            return [value[str(step[1])]]
+        return []
+    if kind == 'wildcard':
+        if isinstance(value, list):
+            return list(value)
+        if isinstance(value, dict):
+            return list(value.values())
+        return []
+    if kind == 'filter':
+        _, field, op, expected = step
+        if not isinstance(value, list):
+            return []
+        field_path = compile_path(field)
+        compare = _OPERATORS[op]
+        matched = []
+        for item in value:
+            actual = field_path.get(item, default=MISSING)
+            try:
+                if actual is not MISSING and compare(actual, expected):
+                    matched.append(item)
+            except TypeError:
+                continue
+        return matched
+    raise ValueError(f"未知的路径步骤: {step}")
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path: str) -> CompiledPath:
+    return CompiledPath(path)
+
+
+def extract_many(data: Any, paths: Iterable[str]) -> Dict[str, Any]:
+    """
+    一次遍历提取多个字段，公共前缀只计算一次；不存在的单值字段返回 MISSING
+    """
+    compiled = [compile_path(path) for path in paths]
+    trie: Dict = {}
+    for path in compiled:
+        node = trie
+        for step in path.steps:
+            node = node.setdefault(step, {})
+        node.setdefault(None, []).append(path)
+
+    results: Dict[str, Any] = {}
+
+    def walk(node: Dict, values: List[Any]):
+        for step, child in node.items():
+            if step is None:
+                for path in child:
+                    results[path.path] = values if path.multi else (values[0] if values else MISSING)
+                continue
+            walk(child, [item for value in values for item in apply_step(step, value)])
+
+    walk(trie, [data])
+    return results
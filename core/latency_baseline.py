@@ -0,0 +1,192 @@
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from config.settings import settings
+from core.logger import log
+from core.metrics import LatencyHistogram, LatencyRecorder
+
+
+def mann_whitney_greater(current: LatencyHistogram, baseline: LatencyHistogram) -> float:
+    """
+    基于直方图桶的单侧 Mann-Whitney U 检验，返回"本次耗时分布整体大于基线"的 p 值
+    同一个桶内的样本按并列处理，使用正态近似并做并列校正
+    """
+    n1, n2 = current.count, baseline.count
+    if not n1 or not n2:
+        return 1.0
+    total = n1 + n2
+    rank_sum, seen, tie_term = 0.0, 0, 0.0
+    for index in sorted(set(current.counts) | set(baseline.counts)):
+        c = current.counts.get(index, 0)
+        tied = c + baseline.counts.get(index, 0)
+        rank_sum += c * (seen + (tied + 1) / 2)
+        tie_term += tied ** 3 - tied
+        seen += tied
+
+    u = rank_sum - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((total + 1) - tie_term / (total * (total - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+@dataclass
+class Regression:
+    endpoint: str
+    baseline_p95_ms: float
+    current_p95_ms: float
+    ratio: float
+    p_value: float
+    samples: int
+    baseline_samples: int
+
+
+class LatencyBaseline:
+    """
+    接口耗时历史与回归门禁: 每次会话结束把各接口耗时直方图追加到 JSONL 历史文件，
+    与同一环境、同一后端最近 window 次运行合并出的基线比较，P95 超出 threshold 且统计显著时判定为回归
+    :param mode: flag 只告警并输出报告，fail 使本次运行失败，off 不比较也不记录
+    :param min_delta_ms: P95 绝对增幅低于该值时不判定回归，避免毫秒级接口的噪声
+    """
+
+    def __init__(
+        self,
+        history_file: Path,
+        window: int = 10,
+        threshold: float = 0.2,
+        alpha: float = 0.01,
+        min_samples: int = 20,
+        min_delta_ms: float = 10,
+        mode: str = 'flag',
+    ):
+        self.history_file = Path(history_file)
+        self.window = window
+        self.threshold = threshold
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.min_delta_ms = min_delta_ms
+        self.mode = mode
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "LatencyBaseline":
+        return cls(
+            history_file=settings.reports_dir / config.get('history_file', 'latency_history.jsonl'),
+            window=int(config.get('window', 10)),
+            threshold=float(os.getenv('LATENCY_GATE_THRESHOLD', config.get('threshold', 0.2))),
+            alpha=float(config.get('alpha', 0.01)),
+            min_samples=int(config.get('min_samples', 20)),
+            min_delta_ms=float(config.get('min_delta_ms', 10)),
+            mode=os.getenv('LATENCY_GATE_MODE', config.get('mode', 'flag')).lower(),
+        )
+
+    @staticmethod
+    def target() -> str:
+        return f"{settings.env}@{urlsplit(settings.base_url).netloc or settings.base_url}"
+
+    def load_history(self, target: str) -> List[Dict[str, Any]]:
+        if not self.history_file.exists():
+            return []
+        runs = []
+        with open(self.history_file, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    run = json.loads(line)
+                except ValueError:
+                    continue
+                if run.get('target') == target:
+                    runs.append(run)
+        return runs[-self.window:]
+
+    @staticmethod
+    def _baseline(runs: List[Dict[str, Any]]) -> Dict[str, LatencyHistogram]:
+        """
+        合并历史各次运行的直方图；某次运行中被判定为回归的接口不计入，避免劣化的耗时逐步抬高基线
+        """
+        merged: Dict[str, LatencyHistogram] = {}
+        for run in runs:
+            flagged = set(run.get('regressions') or ())
+            for endpoint, data in run.get('endpoints', {}).items():
+                if endpoint in flagged:
+                    continue
+                histogram = LatencyHistogram.from_dict(data)
+                if endpoint in merged:
+                    merged[endpoint].merge(histogram)
+                else:
+                    merged[endpoint] = histogram
+        return merged
+
+    def compare(self, recorder: LatencyRecorder, runs: List[Dict[str, Any]]) -> List[Regression]:
+        baseline = self._baseline(runs)
+        regressions = []
+        for endpoint, current in recorder.histograms.items():
+            reference = baseline.get(endpoint)
+            if reference is None or current.count < self.min_samples or reference.count < self.min_samples:
+                continue
+            base_p95, cur_p95 = reference.percentile(95), current.percentile(95)
+            if base_p95 <= 0 or (cur_p95 - base_p95) * 1000 < self.min_delta_ms:
+                continue
+            ratio = cur_p95 / base_p95
+            if ratio <= 1 + self.threshold:
+                continue
+            p_value = mann_whitney_greater(current, reference)
+            if p_value < self.alpha:
+                regressions.append(Regression(
+                    endpoint=endpoint,
+                    baseline_p95_ms=round(base_p95 * 1000, 2),
+                    current_p95_ms=round(cur_p95 * 1000, 2),
+                    ratio=round(ratio, 3),
+                    p_value=p_value,
+                    samples=current.count,
+                    baseline_samples=reference.count,
+                ))
+        return regressions
+
+    def record(self, recorder: LatencyRecorder, target: str, regressions: List[Regression]):
+        run = {
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "target": target,
+            "regressions": [r.endpoint for r in regressions],
+            "endpoints": {endpoint: h.to_dict() for endpoint, h in recorder.histograms.items()},
+        }
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.history_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def check(self, recorder: LatencyRecorder) -> List[Regression]:
+        """
+        与历史基线比较后把本次结果追加到历史，返回回归的接口列表
+        """
+        if self.mode == 'off' or not recorder.histograms:
+            return []
+        target = self.target()
+        runs = self.load_history(target)
+        regressions = self.compare(recorder, runs)
+        self.record(recorder, target, regressions)
+
+        report = settings.reports_dir / 'latency_regression.json'
+        report.write_text(json.dumps({
+            "target": target,
+            "baseline_runs": len(runs),
+            "threshold": self.threshold,
+            "alpha": self.alpha,
+            "regressions": [asdict(r) for r in regressions],
+        }, ensure_ascii=False, indent=2), encoding='utf-8')
+
+        if not runs:
+            log.info(f"接口耗时基线为空，已记录本次运行作为基线: {target}")
+        for r in regressions:
+            log.warning(
+                f"接口耗时回归: {r.endpoint}, P95 {r.baseline_p95_ms}ms -> {r.current_p95_ms}ms "
+                f"(x{r.ratio}, p={r.p_value:.2e}, 样本 {r.samples}/{r.baseline_samples})"
+            )
+        return regressions
+
+
+latency_baseline = LatencyBaseline.from_config(settings.latency_gate_config)
@@ -0,0 +1,19 @@
+from core.load.burst import BurstHarness, BurstReport, BurstResult
+from core.load.runner import LoadRunner, RateLimiter, VirtualUser
+from core.load.scenario import Journey, Stage, ramp_profile
+from core.load.stats import LoadStats, format_report, normalize_endpoint
+
+__all__ = [
+    "BurstHarness",
+    "BurstReport",
+    "BurstResult",
+    "Journey",
+    "LoadRunner",
+    "LoadStats",
+    "RateLimiter",
+    "Stage",
+    "VirtualUser",
+    "format_report",
+    "normalize_endpoint",
+    "ramp_profile",
+]
@@ -0,0 +1,249 @@
+import multiprocessing
+import pickle
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core.json_codec import parse_json
+from core.logger import log
+
+
+@dataclass
+class BurstResult:
+    """
+    单个并发请求的结果，时间戳为 time.time()，多进程之间可直接比较
+    """
+    index: int
+    args: tuple
+    sent_at: float = 0.0
+    finished_at: float = 0.0
+    status_code: Optional[int] = None
+    body: Any = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def elapsed(self) -> float:
+        return self.finished_at - self.sent_at
+
+
+@dataclass
+class BurstReport:
+    results: List[BurstResult]
+    released_at: float
+
+    def status_counts(self) -> Dict[Optional[int], int]:
+        return dict(Counter(r.status_code for r in self.results))
+
+    def succeeded(self, status_code: int = 200) -> List[BurstResult]:
+        return [r for r in self.results if r.status_code == status_code]
+
+    def values(self, field: str, status_code: int = 200) -> List[Any]:
+        """
+        取出所有成功响应中某个字段的值，如 report.values('coupon_code')
+        """
+        return [r.body.get(field) for r in self.succeeded(status_code) if isinstance(r.body, dict)]
+
+    def duplicates(self, field: str, status_code: int = 200) -> Dict[Any, int]:
+        return {value: count for value, count in Counter(self.values(field, status_code)).items() if count > 1}
+
+    @property
+    def start_skew(self) -> float:
+        """
+        放行后最早与最晚发出请求的时间差，越小说明请求越接近同时到达
+        """
+        sent = [r.sent_at for r in self.results if r.sent_at]
+        return max(sent) - min(sent) if sent else 0.0
+
+    @property
+    def duration(self) -> float:
+        finished = [r.finished_at for r in self.results if r.finished_at]
+        return max(finished) - self.released_at if finished else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": len(self.results),
+            "status_counts": {str(code): count for code, count in self.status_counts().items()},
+            "errors": sum(1 for r in self.results if not r.ok),
+            "start_skew_ms": round(self.start_skew * 1000, 2),
+            "duration_ms": round(self.duration * 1000, 2),
+            "max_elapsed_ms": round(max((r.elapsed for r in self.results if r.ok), default=0.0) * 1000, 2),
+        }
+
+
+class _ReleaseClock:
+    """
+    屏障放行动作: 全部执行者就绪时约定一个稍后的统一发送时刻。
+    屏障是逐个唤醒等待者的，直接放行会让后唤醒的执行者晚发出几十毫秒
+    """
+
+    def __init__(self, release_at, delay: float):
+        self.release_at = release_at
+        self.delay = delay
+
+    def __call__(self):
+        self.release_at.value = time.time() + self.delay
+
+
+def _execute(index: int, args: tuple, api, method: str, barrier, release_at, timeout: float) -> BurstResult:
+    result = BurstResult(index=index, args=tuple(args))
+    try:
+        barrier.wait(timeout)
+    except threading.BrokenBarrierError:
+        result.error = f"屏障等待超时({timeout}s)，部分执行者未就绪"
+        return result
+
+    remaining = release_at.value - time.time()
+    if remaining > 0:
+        time.sleep(remaining)
+    result.sent_at = time.time()
+    try:
+        response = getattr(api, method)(*args)
+        result.status_code = response.status_code
+        try:
+            result.body = parse_json(response)
+        except ValueError:
+            result.body = response.text
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.finished_at = time.time()
+    return result
+
+
+def _run_group(
+    api_cls: type,
+    method: str,
+    calls: Sequence[tuple],
+    barrier,
+    release_at,
+    token: Optional[str],
+    warmup: Optional[Callable[[Any], Any]],
+    timeout: float,
+) -> List[BurstResult]:
+    """
+    在当前进程中为每个调用准备独立的 API 客户端并预热，然后全部在屏障处等待
+    :param calls: (index, args) 列表
+    """
+    def _prepare_and_execute(index: int, args: tuple) -> BurstResult:
+        try:
+            api = api_cls()
+            if token:
+                api.set_token(token)
+        except Exception:
+            # 执行者无法就绪时打破屏障，其余执行者立即放弃而不是等到超时
+            barrier.abort()
+            raise
+        try:
+            if warmup is not None:
+                try:
+                    warmup(api)
+                except Exception as e:
+                    log.warning(f"并发执行者预热失败: {e}")
+            return _execute(index, args, api, method, barrier, release_at, timeout)
+        finally:
+            api.client.close()
+
+    with ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix="burst") as executor:
+        futures = [executor.submit(_prepare_and_execute, index, args) for index, args in calls]
+        return [future.result() for future in futures]
+
+
+def _process_main(api_cls, method, calls, barrier, release_at, token, warmup, timeout, queue):
+    try:
+        queue.put(_run_group(api_cls, method, calls, barrier, release_at, token, warmup, timeout))
+    except Exception as e:
+        barrier.abort()
+        queue.put([BurstResult(index=index, args=tuple(args), error=f"{type(e).__name__}: {e}") for index, args in calls])
+
+
+class BurstHarness:
+    """
+    屏障同步的并发突发请求: 每个请求由独立的执行者（独立客户端和连接）发出，
+    全部就绪后在屏障处同时放行，用于复现秒杀、抢券等并发竞争场景
+    用法:
+        harness = BurstHarness(CouponAPI, warmup=lambda api: api.get_coupon_stock(coupon_id))
+        report = harness.fire('receive_coupon', [(coupon_id, user_id) for user_id in user_ids])
+    :param api_cls: API 类，每个执行者各自实例化，避免共享连接池导致请求排队
+    :param mode: thread 在当前进程内用线程执行；process 分摊到 processes 个子进程执行，模拟多个独立客户端
+    :param warmup: 屏障前对每个执行者的 API 对象执行一次，用于提前建立连接，使放行后只剩发送请求；
+        process 模式下需传给子进程，必须是模块级函数（或其 functools.partial），不能是 lambda 或闭包
+    :param timeout: 屏障等待超时时间，超时后所有执行者放弃发送
+    :param release_delay: 全部就绪后到统一发送时刻的间隔，需大于屏障唤醒全部执行者的耗时
+    """
+
+    def __init__(
+        self,
+        api_cls: type,
+        mode: str = 'thread',
+        processes: int = 4,
+        token: Optional[str] = None,
+        warmup: Optional[Callable[[Any], Any]] = None,
+        timeout: float = 30,
+        release_delay: float = 0.1,
+    ):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"不支持的并发模式: {mode}")
+        if mode == 'process' and warmup is not None:
+            try:
+                pickle.dumps(warmup)
+            except Exception as e:
+                raise ValueError(f"process 模式的 warmup 需要传给子进程，必须是模块级函数，不能是 lambda 或闭包: {e}") from e
+        self.api_cls = api_cls
+        self.mode = mode
+        self.processes = processes
+        self.token = token
+        self.warmup = warmup
+        self.timeout = timeout
+        self.release_delay = release_delay
+
+    def fire(self, method: str, args_list: Sequence[tuple]) -> BurstReport:
+        """
+        :param method: API 方法名，如 receive_coupon
+        :param args_list: 每个并发请求的位置参数，列表长度即并发数
+        """
+        calls = [(index, tuple(args)) for index, args in enumerate(args_list)]
+        if not calls:
+            return BurstReport(results=[], released_at=time.time())
+
+        if self.mode == 'thread':
+            release_at = multiprocessing.Value('d', 0.0, lock=False)
+            barrier = threading.Barrier(len(calls), action=_ReleaseClock(release_at, self.release_delay))
+            results = _run_group(self.api_cls, method, calls, barrier, release_at, self.token, self.warmup, self.timeout)
+        else:
+            results = self._fire_processes(method, calls)
+        sent = [r.sent_at for r in results if r.sent_at]
+        report = BurstReport(results=sorted(results, key=lambda r: r.index), released_at=min(sent, default=time.time()))
+        log.info(f"并发突发请求完成: {method}, {report.summary()}")
+        return report
+
+    def _fire_processes(self, method: str, calls: List[tuple]) -> List[BurstResult]:
+        context = multiprocessing.get_context()
+        release_at = context.Value('d', 0.0, lock=False)
+        barrier = context.Barrier(len(calls), action=_ReleaseClock(release_at, self.release_delay))
+        queue = context.Queue()
+        workers = max(1, min(self.processes, len(calls)))
+        groups = [calls[i::workers] for i in range(workers)]
+        processes = [
+            context.Process(
+                target=_process_main,
+                args=(self.api_cls, method, group, barrier, release_at, self.token, self.warmup, self.timeout, queue),
+                name=f"burst-{i}",
+            )
+            for i, group in enumerate(groups)
+        ]
+        for process in processes:
+            process.start()
+
+        results: List[BurstResult] = []
+        # 先取结果再 join，避免子进程因队列缓冲区未被读取而阻塞退出
+        for _ in processes:
+            results.extend(queue.get(timeout=self.timeout * 2 + 60))
+        for process in processes:
+            process.join()
+        return results
@@ -0,0 +1,211 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+from core.decorator import retry
+from core.http_client import HttpClient
+from core.json_codec import CachedJsonResponse, encode_json
+from core.load.scenario import Journey, Stage
+from core.load.stats import LoadStats
+from core.logger import log
+
+
+class RateLimiter:
+    """
+    令牌桶限流，所有虚拟用户共享，保证整体请求速率不超过 rate
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate / 10)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_s = (1 - self.tokens) / self.rate
+            time.sleep(wait_s)
+
+
+class LoadHttpClient(HttpClient):
+    """
+    压测专用客户端：不经过 HttpClient.request 的日志/allure/熔断/录制回放与全局耗时统计，
+    每次发送（含重试）都先经过限流，耗时只记入自己的 LoadStats
+    """
+
+    def __init__(self, base_url: str, stats: LoadStats, limiter: Optional[RateLimiter] = None, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.stats = stats
+        self.limiter = limiter
+        if self.session is not None:
+            adapter = HTTPAdapter(pool_connections=self.pool_maxsize, pool_maxsize=self.pool_maxsize)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+
+    @retry(
+        max_attempts=3,
+        delay=0.5,
+        exceptions=(RequestException,),
+        allowed_methods=("GET", "HEAD", "OPTIONS"),
+        backoff="exponential",
+        jitter=True,
+        max_delay=5.0,
+        retry_on_status=(429, 503),
+    )
+    def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        url = f"{self.base_url}{endpoint}" if not endpoint.startswith('http') else endpoint
+        kwargs.setdefault('timeout', self.timeout)
+        if kwargs.get('json') is not None and not kwargs.get('data'):
+            kwargs['data'] = encode_json(kwargs.pop('json'))
+
+        if self.limiter is not None:
+            self.limiter.acquire()
+
+        start_time = time.perf_counter()
+        try:
+            if self.session is not None:
+                response = self.session.request(method, url, **kwargs)
+            else:
+                response = requests.request(method, url, **kwargs)
+        except Exception as e:
+            self.stats.record(method, endpoint, time.perf_counter() - start_time, error=e)
+            raise
+        self.stats.record(method, endpoint, time.perf_counter() - start_time, status_code=response.status_code)
+        response.__class__ = CachedJsonResponse
+        return response
+
+
+class VirtualUser:
+    def __init__(self, index: int, client: HttpClient):
+        self.index = index
+        self.client = client
+        self.vars: Dict[str, Any] = {}
+        self._apis: Dict[type, Any] = {}
+
+    def api(self, api_cls: type):
+        """
+        获取绑定到当前虚拟用户会话的API对象，如 vu.api(CouponAPI).receive_coupon(...)
+        """
+        if api_cls not in self._apis:
+            self._apis[api_cls] = api_cls(client=self.client)
+        return self._apis[api_cls]
+
+
+class LoadRunner:
+    """
+    压测引擎：按阶段调整虚拟用户数，每个虚拟用户按权重循环执行用户旅程
+    :param journeys: 用户旅程列表
+    :param stages: 压测阶段，虚拟用户数在阶段内线性变化
+    :param target_rps: 全局目标RPS，None表示不限速
+    :param think_time: 两次旅程之间的等待时间（秒）
+    :param on_start: 虚拟用户启动时执行的初始化函数，如登录
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        journeys: Sequence[Journey],
+        stages: Sequence[Stage],
+        target_rps: Optional[float] = None,
+        think_time: float = 0.0,
+        timeout: int = 30,
+        on_start: Optional[Callable[[VirtualUser], None]] = None,
+    ):
+        if not journeys:
+            raise ValueError("至少需要一个用户旅程")
+        if not stages:
+            raise ValueError("至少需要一个压测阶段")
+
+        self.base_url = base_url
+        self.journeys = list(journeys)
+        self.stages = list(stages)
+        self.think_time = think_time
+        self.timeout = timeout
+        self.on_start = on_start
+        self.stats = LoadStats()
+        self.limiter = RateLimiter(target_rps) if target_rps else None
+        self.active_users = 0
+        self._stop = threading.Event()
+
+    def _target_users(self, elapsed: float) -> Optional[int]:
+        previous_users = 0
+        stage_start = 0.0
+        for stage in self.stages:
+            if elapsed < stage_start + stage.duration:
+                progress = (elapsed - stage_start) / stage.duration
+                return int(round(previous_users + (stage.users - previous_users) * progress))
+            previous_users = stage.users
+            stage_start += stage.duration
+        return None
+
+    def _pick_journey(self) -> Journey:
+        return random.choices(self.journeys, weights=[j.weight for j in self.journeys], k=1)[0]
+
+    def _run_user(self, index: int):
+        client = LoadHttpClient(self.base_url, self.stats, self.limiter, timeout=self.timeout)
+        vu = VirtualUser(index, client)
+        started = False
+        try:
+            while not self._stop.is_set():
+                if index >= self.active_users:
+                    time.sleep(0.05)
+                    continue
+
+                if not started and self.on_start is not None:
+                    self.on_start(vu)
+                started = True
+
+                journey = self._pick_journey()
+                try:
+                    journey.steps(vu)
+                except Exception as e:
+                    self.stats.record_journey_error(journey.name)
+                    log.warning(f"虚拟用户 {index} 执行旅程 {journey.name} 异常: {str(e)}")
+
+                if self.think_time:
+                    self._stop.wait(self.think_time)
+        finally:
+            client.close()
+
+    def run(self) -> Dict[str, Any]:
+        max_users = max(stage.users for stage in self.stages)
+        threads: List[threading.Thread] = [
+            threading.Thread(target=self._run_user, args=(i,), name=f"vu-{i}", daemon=True)
+            for i in range(max_users)
+        ]
+        log.info(f"压测开始: 阶段 {len(self.stages)} 个, 最大虚拟用户 {max_users}")
+
+        start_time = time.monotonic()
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                target = self._target_users(time.monotonic() - start_time)
+                if target is None:
+                    break
+                self.active_users = target
+                time.sleep(0.1)
+        finally:
+            self.active_users = 0
+            self._stop.set()
+            for thread in threads:
+                thread.join(timeout=self.timeout)
+
+        duration = time.monotonic() - start_time
+        report = self.stats.report(duration)
+        log.info(f"压测结束: 总请求 {report['requests']}, 吞吐 {report['rps']} req/s, 错误率 {report['error_rate']:.2%}")
+        return report
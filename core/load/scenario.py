@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+from typing import Callable, List
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    压测阶段：在 duration 秒内把虚拟用户数线性调整到 users
+    """
+    duration: float
+    users: int
+
+
+@dataclass
+class Journey:
+    """
+    用户旅程：由若干 api/ 调用组成的函数，接收 VirtualUser 作为唯一参数
+    """
+    name: str
+    steps: Callable
+    weight: int = 1
+
+
+def ramp_profile(users: int, ramp_up: float, steady: float, ramp_down: float = 0.0) -> List[Stage]:
+    stages = [Stage(ramp_up, users), Stage(steady, users)]
+    if ramp_down > 0:
+        stages.append(Stage(ramp_down, 0))
+    return [stage for stage in stages if stage.duration > 0]
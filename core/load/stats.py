@@ -0,0 +1,86 @@
+import threading
+from typing import Any, Dict, Optional
+
+from core.metrics import LatencyHistogram, normalize_endpoint
+
+
+class EndpointStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.histogram = LatencyHistogram()
+
+    def record(self, elapsed: float, failed: bool):
+        self.count += 1
+        self.histogram.record(elapsed)
+        if failed:
+            self.errors += 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        histogram = self.histogram
+        return {
+            "endpoint": self.name,
+            "requests": self.count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.count, 4) if self.count else 0.0,
+            "rps": round(self.count / duration, 2) if duration > 0 else 0.0,
+            "p50_ms": round(histogram.percentile(50) * 1000, 2),
+            "p90_ms": round(histogram.percentile(90) * 1000, 2),
+            "p95_ms": round(histogram.percentile(95) * 1000, 2),
+            "p99_ms": round(histogram.percentile(99) * 1000, 2),
+            "max_ms": round(histogram.max * 1000, 2),
+        }
+
+
+class LoadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.journey_errors: Dict[str, int] = {}
+
+    def record(self, method: str, endpoint: str, elapsed: float, status_code: Optional[int] = None, error: Optional[BaseException] = None):
+        name = f"{method.upper()} {normalize_endpoint(endpoint)}"
+        failed = error is not None or status_code is None or status_code >= 400
+        with self._lock:
+            stats = self.endpoints.get(name)
+            if stats is None:
+                stats = self.endpoints[name] = EndpointStats(name)
+            stats.record(elapsed, failed)
+
+    def record_journey_error(self, journey: str):
+        with self._lock:
+            self.journey_errors[journey] = self.journey_errors.get(journey, 0) + 1
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = [stats.summary(duration) for stats in sorted(self.endpoints.values(), key=lambda s: s.name)]
+            journey_errors = dict(self.journey_errors)
+
+        total = sum(item["requests"] for item in endpoints)
+        errors = sum(item["errors"] for item in endpoints)
+        return {
+            "duration_s": round(duration, 2),
+            "requests": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "rps": round(total / duration, 2) if duration > 0 else 0.0,
+            "journey_errors": journey_errors,
+            "endpoints": endpoints,
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"持续时间: {report['duration_s']}s, 总请求: {report['requests']}, "
+        f"吞吐: {report['rps']} req/s, 错误率: {report['error_rate']:.2%}",
+        f"{'接口':<48}{'请求数':>8}{'错误率':>9}{'RPS':>9}{'P50':>9}{'P90':>9}{'P99':>9}{'MAX':>9}",
+    ]
+    for item in report["endpoints"]:
+        lines.append(
+            f"{item['endpoint']:<48}{item['requests']:>8}{item['error_rate']:>9.2%}{item['rps']:>9}"
+            f"{item['p50_ms']:>9}{item['p90_ms']:>9}{item['p99_ms']:>9}{item['max_ms']:>9}"
+        )
+    if report["journey_errors"]:
+        lines.append(f"旅程异常: {report['journey_errors']}")
+    return "\n".join(lines)
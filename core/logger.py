@@ -1,48 +1,130 @@
+import heapq
+import os
+import re
 import sys
 from pathlib import Path
+from typing import Iterator, List, Tuple
 from loguru import logger
 from datetime import datetime
+from config.settings import settings
+
+FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}"
+RECORD_START = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d{3})? \| ')
 
 
 class Logger:
-    def __init__(self, log_dir="logs"):
+    """
+    :param file_level: 日志文件级别，默认取环境配置 log_level，可用 LOG_LEVEL 覆盖
+    :param enqueue: 是否通过后台线程队列写日志，默认在 xdist worker 中开启，可用 LOG_ENQUEUE 覆盖
+    xdist 并行时每个 worker 写入各自的 test_YYYYMMDD_gwN.log，全部 worker 退出后由主进程按时间合并到 test_YYYYMMDD_merged.log
+    """
+
+    def __init__(self, log_dir="logs", file_level: str = "DEBUG"):
         self.log_dir = Path(log_dir)
+        self.file_level = file_level
         self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.worker_id = os.getenv('PYTEST_XDIST_WORKER', '')
+        enqueue = os.getenv('LOG_ENQUEUE')
+        if enqueue is not None:
+            self.enqueue = enqueue.lower() in {'1', 'true', 'yes', 'on'}
+        else:
+            self.enqueue = bool(self.worker_id)
         self._setup_logger()
+        self._min_level_no = min(logger.level(level).no for level in ("INFO", self.file_level, "ERROR"))
+
+    def enabled(self, level: str) -> bool:
+        """
+        是否有日志输出接收该级别，调用方据此跳过开销较大的日志内容拼装
+        """
+        return logger.level(level).no >= self._min_level_no
+
+    def _file_name(self, prefix: str) -> Path:
+        suffix = f"_{self.worker_id}" if self.worker_id else ""
+        return self.log_dir / f"{prefix}_{datetime.now().strftime('%Y%m%d')}{suffix}.log"
 
     def _setup_logger(self):
         logger.remove()
-        
+
         logger.add(
             sys.stdout,
             format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
             level="INFO",
-            colorize=True
+            colorize=True,
+            enqueue=self.enqueue
         )
-        
-        log_file = self.log_dir / f"test_{datetime.now().strftime('%Y%m%d')}.log"
+
         logger.add(
-            log_file,
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-            level="DEBUG",
+            self._file_name("test"),
+            format=FILE_FORMAT,
+            level=self.file_level,
             rotation="00:00",
             retention="30 days",
-            encoding="utf-8"
+            encoding="utf-8",
+            enqueue=self.enqueue
         )
-        
-        error_log = self.log_dir / f"error_{datetime.now().strftime('%Y%m%d')}.log"
+
         logger.add(
-            error_log,
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+            self._file_name("error"),
+            format=FILE_FORMAT,
             level="ERROR",
             rotation="00:00",
             retention="30 days",
-            encoding="utf-8"
+            encoding="utf-8",
+            enqueue=self.enqueue
         )
 
+    def complete(self):
+        """
+        等待队列中的日志全部落盘，worker 退出前调用
+        """
+        logger.complete()
+
+    @staticmethod
+    def _read_records(file_path: Path, tag: str) -> Iterator[Tuple[str, str]]:
+        record: List[str] = []
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if RECORD_START.match(line) and record:
+                    yield record[0][:23], ''.join(record)
+                    record = []
+                record.append(line if record else f"{line[:23]} [{tag}]{line[23:]}")
+        if record:
+            yield record[0][:23], ''.join(record)
+
+    def merge_worker_logs(self) -> List[Path]:
+        """
+        把主进程和各 worker 的日志（含按天轮转出的历史文件）按时间戳归并到 test_YYYYMMDD_merged.log，
+        原日志保留，由 retention 统一清理；需在全部 worker 退出后调用
+        """
+        logger.complete()
+        merged = []
+        for prefix in ("test", "error"):
+            pattern = re.compile(rf'^{prefix}_(\d{{8}})(?:_(gw\d+))?(?:\.[\d_-]+)?\.log$')
+            groups = {}
+            for file_path in sorted(self.log_dir.glob(f"{prefix}_*.log")):
+                match = pattern.match(file_path.name)
+                if match:
+                    groups.setdefault(match.group(1), []).append((match.group(2) or "main", file_path))
+
+            for date, files in groups.items():
+                if all(tag == "main" for tag, _ in files):
+                    continue
+                target = self.log_dir / f"{prefix}_{date}_merged.log"
+                # 同一文件内多线程写入的记录也不严格有序，每个文件先稳定排序再归并
+                streams = [sorted(self._read_records(path, tag), key=lambda item: item[0]) for tag, path in files]
+                with open(target, 'w', encoding='utf-8') as out:
+                    for _, text in heapq.merge(*streams, key=lambda item: item[0]):
+                        out.write(text)
+                merged.append(target)
+
+        if merged:
+            logger.info(f"已合并 worker 日志: {', '.join(str(p) for p in merged)}")
+        return merged
+
     @staticmethod
     def get_logger():
         return logger
 
 
-log = Logger().get_logger()
+logger_manager = Logger(file_level=settings.log_level)
+log = logger_manager.get_logger()
@@ -0,0 +1,241 @@
+import json
+import math
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'transfer')
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27,}|[A-Z]{2,}[0-9A-Z]{8,})$')
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """
+    把路径中的ID段替换为占位符: /api/v1/coupons/123/stock -> /api/v1/coupons/{id}/stock
+    """
+    path = endpoint.split('?', 1)[0]
+    if '://' in path:
+        path = '/' + path.split('://', 1)[1].partition('/')[2]
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+class LatencyHistogram:
+    """
+    HDR风格的对数-线性直方图，以微秒为单位计数，相对误差约 1/2^sub_bucket_bits
+    桶按下标稀疏存储，可跨进程序列化后直接合并
+    """
+
+    def __init__(self, sub_bucket_bits: int = 7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def _index(self, value_us: int) -> int:
+        linear_limit = 1 << (self.sub_bucket_bits + 1)
+        if value_us < linear_limit:
+            return value_us
+        shift = value_us.bit_length() - self.sub_bucket_bits - 1
+        mantissa = value_us >> shift
+        return linear_limit + (shift - 1) * (1 << self.sub_bucket_bits) + mantissa - (1 << self.sub_bucket_bits)
+
+    def _value(self, index: int) -> int:
+        linear_limit = 1 << (self.sub_bucket_bits + 1)
+        if index < linear_limit:
+            return index
+        offset = index - linear_limit
+        shift = offset // (1 << self.sub_bucket_bits) + 1
+        mantissa = offset % (1 << self.sub_bucket_bits) + (1 << self.sub_bucket_bits)
+        return (mantissa << shift) + (1 << (shift - 1))
+
+    def record(self, seconds: float):
+        value_us = max(0, int(seconds * 1_000_000))
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = max(self.max_us, value_us)
+
+    def merge(self, other: "LatencyHistogram"):
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("直方图精度不一致，无法合并")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, pct: float) -> float:
+        """
+        返回百分位延迟（秒）
+        """
+        if not self.count:
+            return 0.0
+        threshold = max(1, math.ceil(pct / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= threshold:
+                return min(self._value(index), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    @property
+    def mean(self) -> float:
+        return self.total_us / self.count / 1_000_000 if self.count else 0.0
+
+    @property
+    def max(self) -> float:
+        return self.max_us / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sub_bucket_bits": self.sub_bucket_bits,
+            "count": self.count,
+            "total_us": self.total_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "counts": {str(index): count for index, count in self.counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(sub_bucket_bits=data.get("sub_bucket_bits", 7))
+        histogram.counts = {int(index): count for index, count in data.get("counts", {}).items()}
+        histogram.count = data.get("count", 0)
+        histogram.total_us = data.get("total_us", 0)
+        histogram.min_us = data.get("min_us")
+        histogram.max_us = data.get("max_us", 0)
+        return histogram
+
+
+class LatencyRecorder:
+    """
+    按 "METHOD /模板化路径" 聚合接口耗时，线程安全
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.phases: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self.reused: Dict[str, int] = {}
+
+    @staticmethod
+    def key(method: str, endpoint: str) -> str:
+        return f"{str(method).upper()} {normalize_endpoint(endpoint)}"
+
+    def record(self, method: str, endpoint: str, elapsed: float, failed: bool = False):
+        key = self.key(method, endpoint)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(elapsed)
+            if failed:
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def record_timing(self, method: str, endpoint: str, timing):
+        """
+        记录一次请求的网络分阶段耗时（NetworkTiming）及是否复用连接
+        """
+        key = self.key(method, endpoint)
+        with self._lock:
+            phases = self.phases.setdefault(key, {})
+            for phase in PHASES:
+                histogram = phases.get(phase)
+                if histogram is None:
+                    histogram = phases[phase] = LatencyHistogram()
+                histogram.record(getattr(timing, phase))
+            if timing.reused:
+                self.reused[key] = self.reused.get(key, 0) + 1
+
+    def percentile(self, method: str, endpoint: str, pct: float, min_samples: int = 1) -> Optional[float]:
+        """
+        返回某接口当前的分位耗时（秒），样本不足时返回 None
+        """
+        with self._lock:
+            histogram = self.histograms.get(self.key(method, endpoint))
+            if histogram is None or histogram.count < min_samples:
+                return None
+            return histogram.percentile(pct)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                key: {
+                    "histogram": histogram.to_dict(),
+                    "errors": self.errors.get(key, 0),
+                    "phases": {phase: h.to_dict() for phase, h in self.phases.get(key, {}).items()},
+                    "reused": self.reused.get(key, 0),
+                }
+                for key, histogram in self.histograms.items()
+            }
+
+    def merge_dict(self, data: Dict[str, Any]):
+        with self._lock:
+            for key, item in data.items():
+                histogram = LatencyHistogram.from_dict(item["histogram"])
+                if key in self.histograms:
+                    self.histograms[key].merge(histogram)
+                else:
+                    self.histograms[key] = histogram
+                if item.get("errors"):
+                    self.errors[key] = self.errors.get(key, 0) + item["errors"]
+                for phase, phase_data in (item.get("phases") or {}).items():
+                    phase_histogram = LatencyHistogram.from_dict(phase_data)
+                    phases = self.phases.setdefault(key, {})
+                    if phase in phases:
+                        phases[phase].merge(phase_histogram)
+                    else:
+                        phases[phase] = phase_histogram
+                if item.get("reused"):
+                    self.reused[key] = self.reused.get(key, 0) + item["reused"]
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for key, histogram in sorted(self.histograms.items()):
+                item = {
+                    "count": histogram.count,
+                    "errors": self.errors.get(key, 0),
+                    "mean_ms": round(histogram.mean * 1000, 2),
+                    "p50_ms": round(histogram.percentile(50) * 1000, 2),
+                    "p90_ms": round(histogram.percentile(90) * 1000, 2),
+                    "p99_ms": round(histogram.percentile(99) * 1000, 2),
+                    "max_ms": round(histogram.max * 1000, 2),
+                }
+                phases = self.phases.get(key)
+                if phases:
+                    timed = phases[PHASES[0]].count
+                    item["connection_reuse_rate"] = round(self.reused.get(key, 0) / timed, 4) if timed else 0.0
+                    item["phases_ms"] = {
+                        phase: {
+                            "mean": round(h.mean * 1000, 2),
+                            "p90": round(h.percentile(90) * 1000, 2),
+                        }
+                        for phase, h in phases.items()
+                    }
+                result[key] = item
+            return result
+
+    def dump(self, file_path: Union[str, Path]) -> Path:
+        path = Path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"summary": self.summary(), "histograms": self.to_dict()}
+        path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding='utf-8')
+        return path
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.errors.clear()
+            self.phases.clear()
+            self.reused.clear()
+
+
+latency_recorder = LatencyRecorder()
@@ -0,0 +1,170 @@
+import socket
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+try:
+    from urllib3.exceptions import NameResolutionError
+except ImportError:
+    # urllib3 < 2 没有 NameResolutionError，DNS 解析失败与其一致按 NewConnectionError 抛出
+    def NameResolutionError(host, conn, reason):
+        return NewConnectionError(conn, f"Failed to resolve '{host}' ({reason})")
+
+from core.logger import log
+from core.metrics import PHASES
+
+_timing_warned = False
+
+
+@dataclass
+class NetworkTiming:
+    """
+    单次请求的分阶段耗时（秒），复用连接时 dns/connect/tls 为 0
+    ttfb: 请求发出（或新建连接完成）到收到响应头；transfer: 响应头到响应体读取完毕
+    """
+    dns: float = 0.0
+    connect: float = 0.0
+    tls: float = 0.0
+    ttfb: float = 0.0
+    transfer: float = 0.0
+    reused: bool = False
+
+    @property
+    def setup(self) -> float:
+        return self.dns + self.connect + self.tls
+
+    @property
+    def total(self) -> float:
+        return self.setup + self.ttfb + self.transfer
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.update(setup=self.setup, total=self.total)
+        return data
+
+    def __str__(self) -> str:
+        phases = ', '.join(f"{phase}={getattr(self, phase) * 1000:.1f}ms" for phase in PHASES)
+        return f"{phases}, reused={self.reused}"
+
+
+class _TimedConnectionMixin:
+    """
+    在 urllib3 连接上记录建连各阶段耗时，并把结果挂到 urllib3 响应的 timing 属性上
+    """
+    _timing_dns = 0.0
+    _timing_connect = 0.0
+    _timing_tls = 0.0
+    _timing_connected_at = 0.0
+    _timing_request_at = 0.0
+    _timing_socket_requests = 0
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        dns_host = self._dns_host
+        try:
+            address = socket.getaddrinfo(dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)[0][4][0]
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        resolved = time.perf_counter()
+
+        self._dns_host = address
+        try:
+            sock = super()._new_conn()
+        except NewConnectionError:
+            # 首个解析地址不可达时（如 localhost 优先解析到 ::1），交由 urllib3 按全部地址依次尝试
+            self._dns_host = dns_host
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+        self._timing_dns = resolved - started
+        self._timing_connect = time.perf_counter() - resolved
+        return sock
+
+    def connect(self):
+        started = time.perf_counter()
+        self._timing_dns = self._timing_connect = 0.0
+        super().connect()
+        self._timing_connected_at = time.perf_counter()
+        self._timing_tls = max(0.0, self._timing_connected_at - started - self._timing_dns - self._timing_connect)
+        self._timing_socket_requests = 0
+
+    def request(self, *args, **kwargs):
+        self._timing_request_at = time.perf_counter()
+        return super().request(*args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        headers_at = time.perf_counter()
+        self._timing_socket_requests += 1
+        reused = self._timing_socket_requests > 1
+        sent_at = max(self._timing_request_at, self._timing_connected_at)
+        response.timing = NetworkTiming(
+            dns=0.0 if reused else self._timing_dns,
+            connect=0.0 if reused else self._timing_connect,
+            tls=0.0 if reused else self._timing_tls,
+            ttfb=headers_at - sent_at,
+            reused=reused,
+        )
+        response.timing_headers_at = headers_at
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+_TIMED_POOL_CLASSES = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    使用带分阶段计时连接的 HTTPAdapter，用法与 HTTPAdapter 相同
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = dict(_TIMED_POOL_CLASSES)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        # 经 HTTP(S) 代理的请求使用单独的 ProxyManager，同样替换为计时连接池；SOCKS 代理有自己的连接类，不计时
+        if not proxy.lower().startswith('socks'):
+            manager.pool_classes_by_scheme = dict(_TIMED_POOL_CLASSES)
+        return manager
+
+
+def attach_timing(response, finished_at: float) -> Optional[NetworkTiming]:
+    """
+    响应体读取完成后补齐 transfer 阶段，并挂到 requests 响应的 timing 属性上
+    """
+    global _timing_warned
+    raw = getattr(response, 'raw', None)
+    # urllib3 1.x 的 getresponse 返回 http.client 响应，计时挂在包装前的原始响应上
+    source = raw if hasattr(raw, 'timing') else getattr(raw, '_original_response', None)
+    timing: Optional[NetworkTiming] = getattr(source, 'timing', None)
+    if timing is None:
+        if not _timing_warned:
+            _timing_warned = True
+            log.warning(f"未能获取请求分阶段耗时（连接未经过 TimedHTTPAdapter，如 SOCKS 代理或自定义适配器），后续不再提示: {response.url}")
+        return None
+    timing.transfer = max(0.0, finished_at - source.timing_headers_at)
+    response.timing = timing
+    return timing
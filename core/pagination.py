@@ -0,0 +1,126 @@
+import math
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from core.json_codec import parse_json
+from core.json_path import compile_path
+from core.logger import log
+
+
+class PageIterator:
+    """
+    按页流式遍历列表接口，后台预取后续 prefetch 页；内存中最多保留 prefetch+1 页数据
+    提前 break 或达到 max_items 时停止翻页并取消未开始的预取
+    :param fetch_page: fetch_page(page, page_size) -> Response
+    :param items_path: 响应中列表字段的路径，None 表示响应体本身就是列表
+    :param total_path: 响应中总数字段的路径，用于确定最后一页；服务端把 page_size 限制得比请求值小时按实际每页条数计算，
+        响应中没有总数时才以不满一页作为结束
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[int, int], Any],
+        page_size: int = 100,
+        prefetch: int = 2,
+        max_items: Optional[int] = None,
+        items_path: Optional[str] = 'items',
+        total_path: Optional[str] = 'total',
+        start_page: int = 1,
+    ):
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.prefetch = max(0, prefetch)
+        self.max_items = max_items
+        self.items_path = compile_path(items_path) if items_path else None
+        self.total_path = compile_path(total_path) if total_path else None
+        self.start_page = start_page
+        self.total: Optional[int] = None
+        self.server_page_size = page_size
+        self.pages_fetched = 0
+        self._received = 0
+
+    def _load(self, page: int) -> Dict[str, Any]:
+        response = self.fetch_page(page, self.page_size)
+        if not 200 <= response.status_code < 300:
+            raise RuntimeError(f"分页查询失败: 第{page}页, 状态码 {response.status_code}, 响应: {response.text[:200]}")
+        body = parse_json(response)
+        items = self.items_path.get(body, default=[]) if self.items_path else body
+        total = self.total_path.get(body, default=None) if self.total_path and isinstance(body, dict) else None
+        return {"items": items or [], "total": total}
+
+    def _accept(self, page: int, result: Dict[str, Any]) -> bool:
+        """
+        记录一页的结果，返回是否已是最后一页
+        """
+        items = result["items"]
+        self.pages_fetched += 1
+        self._received += len(items)
+        if self.total is None and result["total"] is not None:
+            self.total = int(result["total"])
+        if self.total is None:
+            return len(items) < self.page_size
+        if page == self.start_page and 0 < len(items) < min(self.page_size, self.total):
+            # 服务端限制了每页条数，按实际条数推算最后一页
+            self.server_page_size = len(items)
+        return not items or self._received >= self.total
+
+    def _last_page(self) -> Optional[int]:
+        if self.total is None:
+            return None
+        return self.start_page + max(0, math.ceil(self.total / self.server_page_size) - 1)
+
+    def __iter__(self) -> Iterator[Any]:
+        self._received = 0
+        if self.prefetch == 0:
+            yield from self._iter_sequential()
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self.prefetch, thread_name_prefix="page-prefetch")
+        pending: Dict[int, Future] = {}
+        next_page = self.start_page
+        yielded = 0
+        try:
+            page = self.start_page
+            pending[page] = executor.submit(self._load, page)
+            next_page = page + 1
+            while page in pending:
+                result = pending.pop(page).result()
+                finished = self._accept(page, result)
+                items: List[Any] = result["items"]
+                del result
+
+                last_page = self._last_page()
+                if not finished:
+                    while len(pending) < self.prefetch and (last_page is None or next_page <= last_page):
+                        pending[next_page] = executor.submit(self._load, next_page)
+                        next_page += 1
+
+                for item in items:
+                    if self.max_items is not None and yielded >= self.max_items:
+                        return
+                    yielded += 1
+                    yield item
+                if finished:
+                    return
+                page += 1
+        finally:
+            for future in pending.values():
+                future.cancel()
+            executor.shutdown(wait=False)
+            log.info(f"分页遍历结束: 共获取 {self.pages_fetched} 页, 返回 {yielded} 条")
+
+    def _iter_sequential(self) -> Iterator[Any]:
+        yielded = 0
+        page = self.start_page
+        while True:
+            result = self._load(page)
+            finished = self._accept(page, result)
+            items = result["items"]
+            for item in items:
+                if self.max_items is not None and yielded >= self.max_items:
+                    return
+                yielded += 1
+                yield item
+            if finished:
+                return
+            page += 1
@@ -0,0 +1,220 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from config.settings import settings
+from core.logger import log
+from core.metrics import latency_recorder
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    熔断器打开时快速失败抛出的异常，不会被 retry 重试
+    """
+
+    def __init__(self, host: str, retry_after: float):
+        self.host = host
+        self.retry_after = retry_after
+        super().__init__(f"后端 {host} 连续失败已熔断，{retry_after:.1f}s 后允许探测请求")
+
+
+class CircuitBreaker:
+    """
+    单个主机的熔断器: closed -> (连续失败达到阈值) -> open -> (冷却结束) -> half_open -> (探测成功) -> closed
+    只有连接错误、超时和 502/503/504 说明后端不可用，计为失败；500 等业务错误不触发熔断
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    FAILURE_STATUSES = frozenset({502, 503, 504})
+
+    def __init__(self, host: str, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.recovery_timeout - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(self.host, remaining)
+                self.state = self.HALF_OPEN
+                self.half_open_calls = 0
+                log.info(f"熔断器半开，允许探测请求: {self.host}")
+
+            if self.state == self.HALF_OPEN:
+                if self.half_open_calls >= self.half_open_max_calls:
+                    raise CircuitOpenError(self.host, 0.0)
+                self.half_open_calls += 1
+
+    def record_outcome(self, status_code: Optional[int] = None, transport_error: bool = False):
+        """
+        请求结束（包括抛出异常）后调用，需放在 finally 中保证半开探测名额一定被释放
+        :param status_code: 收到响应时的状态码
+        :param transport_error: 是否为连接错误或超时；既无响应也不是传输错误时（如参数错误、请求被取消）不计入结果
+        """
+        if transport_error or status_code in self.FAILURE_STATUSES:
+            self.record_failure()
+        elif status_code is not None:
+            self.record_success()
+        else:
+            self.release()
+
+    def release(self):
+        """
+        归还半开探测名额而不改变熔断状态
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN and self.half_open_calls > 0:
+                self.half_open_calls -= 1
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                log.info(f"熔断器恢复关闭: {self.host}")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    log.error(f"熔断器打开: {self.host}, 连续失败 {self.failures} 次, 冷却 {self.recovery_timeout}s")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    def __init__(self, enabled: bool = True, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.enabled = enabled
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> Optional[CircuitBreaker]:
+        if not self.enabled:
+            return None
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    host,
+                    CircuitBreaker(host, self.failure_threshold, self.recovery_timeout),
+                )
+        return breaker
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+
+class RetryBudget:
+    """
+    全局重试预算（令牌桶）: 每个请求存入 ratio 个令牌，每次重试消耗1个，
+    保证重试带来的额外请求不超过正常请求的 ratio 比例；min_tokens 为启动时的保底额度
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10, max_tokens: float = 100):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = float(min_tokens)
+        self.requests = 0
+        self.retries = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.retries += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "rejected": self.rejected,
+                "tokens": round(self.tokens, 2),
+            }
+
+
+class HedgePolicy:
+    """
+    对冲请求策略: 幂等请求在 delay 内未返回时再发一份相同请求，取先成功返回的结果
+    :param delay: 固定对冲延迟（秒），None 表示按该接口历史耗时的 percentile 分位动态计算
+    :param percentile: 动态延迟使用的分位数
+    :param min_samples: 历史样本数不足时使用 fallback_delay
+    """
+
+    def __init__(
+        self,
+        delay: Optional[float] = None,
+        percentile: float = 95,
+        min_delay: float = 0.05,
+        max_delay: float = 2.0,
+        fallback_delay: float = 0.5,
+        min_samples: int = 20,
+        methods: Iterable[str] = ("GET", "HEAD"),
+    ):
+        self.delay = delay
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.fallback_delay = fallback_delay
+        self.min_samples = min_samples
+        self.methods = {m.upper() for m in methods}
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def applies_to(self, method: str) -> bool:
+        return method.upper() in self.methods
+
+    def delay_for(self, method: str, endpoint: str) -> float:
+        if self.delay is not None:
+            return self.delay
+        observed = latency_recorder.percentile(method, endpoint, self.percentile, self.min_samples)
+        if observed is None:
+            return self.fallback_delay
+        return min(self.max_delay, max(self.min_delay, observed))
+
+    def record(self, hedge_won: bool):
+        with self._lock:
+            self.hedged += 1
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hedged": self.hedged, "hedge_wins": self.hedge_wins}
+
+
+_config = settings.resilience_config
+circuit_breakers = CircuitBreakerRegistry(
+    enabled=bool(_config.get('circuit_breaker_enabled', True)),
+    failure_threshold=int(_config.get('failure_threshold', 5)),
+    recovery_timeout=float(_config.get('recovery_timeout', 30)),
+)
+retry_budget = RetryBudget(
+    ratio=float(_config.get('retry_budget_ratio', 0.2)),
+    min_tokens=float(_config.get('retry_budget_min', 10)),
+)
@@ -0,0 +1,188 @@
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+from core.logger import log
+from core.metrics import normalize_endpoint
+
+CONDITIONAL_HEADERS = ('If-None-Match', 'If-Modified-Since')
+
+
+class CacheEntry:
+    __slots__ = ('path', 'response', 'expires_at', 'etag', 'last_modified')
+
+    def __init__(self, path: str, response: requests.Response, ttl: float):
+        self.path = path
+        self.response = response
+        self.expires_at = time.monotonic() + ttl
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+class ResponseCache:
+    """
+    HttpClient 的只读接口响应缓存，只缓存配置了TTL的GET路由:
+    TTL 内直接返回缓存，过期后携带 If-None-Match / If-Modified-Since 重新验证（304 时续期）
+    同一客户端对同一资源路径发起写请求（POST/PUT/PATCH/DELETE）时，该资源及其子路径、所属列表的缓存立即失效；
+    路径中不带ID的写请求（如 /api/v1/coupons/batch-receive）无法确定影响了哪些资源，使整个集合下的缓存失效
+    :param ttl: 路由模板 -> 缓存秒数，如 {"/api/v1/coupons/{id}": 5}
+    """
+
+    def __init__(self, ttl: Dict[str, float], max_entries: int = 1024):
+        self.ttl = {template: float(seconds) for template, seconds in ttl.items()}
+        self.collections = {self._collection_of(template) for template in self.ttl}
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["ResponseCache"]:
+        """
+        配置未开启时返回 None；环境变量 HTTP_CACHE=1/0 可覆盖配置
+        """
+        enabled = os.getenv('HTTP_CACHE')
+        enabled = enabled.lower() in ('1', 'true', 'yes') if enabled is not None else bool(config.get('enabled', False))
+        if not enabled:
+            return None
+        return cls(config.get('ttl') or {}, int(config.get('max_entries', 1024)))
+
+    @staticmethod
+    def key(url: str, kwargs: Dict[str, Any], authorization: Optional[str]) -> Tuple:
+        parts = urlsplit(url)
+        params = kwargs.get('params') or {}
+        items = params.items() if isinstance(params, dict) else params
+        query = urlencode(sorted((str(k), str(v)) for k, v in items if v is not None))
+        return parts.netloc, parts.path, parts.query, query, authorization or ''
+
+    @staticmethod
+    def _collection_of(template: str) -> str:
+        """
+        路由模板所属集合: /api/v1/coupons/{id}/stock -> /api/v1/coupons，不带ID的 /api/v1/auth/userinfo -> /api/v1/auth
+        """
+        template = template.rstrip('/')
+        if '{id}' in template:
+            return template[:template.index('{id}')].rstrip('/')
+        return template.rsplit('/', 1)[0]
+
+    def ttl_for(self, method: str, url: str) -> Optional[float]:
+        if method.upper() != 'GET':
+            return None
+        return self.ttl.get(normalize_endpoint(url))
+
+    def lookup(self, key: Tuple, headers: Dict[str, str]) -> Optional[requests.Response]:
+        """
+        命中且未过期时返回响应副本；已过期但带校验信息时把条件请求头写入 headers
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            if entry.fresh:
+                self.hits += 1
+                return self._copy(entry.response, 'hit')
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+            if not (entry.etag or entry.last_modified):
+                del self._entries[key]
+        return None
+
+    def store(self, key: Tuple, ttl: float, response: requests.Response) -> Optional[requests.Response]:
+        """
+        304 时续期并返回缓存副本，2xx 时写入缓存
+        条件请求期间缓存条目已被淘汰时返回 None，调用方需去掉条件请求头重新请求
+        """
+        with self._lock:
+            if response.status_code == 304:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self.revalidated += 1
+                    entry.expires_at = time.monotonic() + ttl
+                    cached = self._copy(entry.response, 'revalidated')
+                    cached.elapsed = response.elapsed
+                    return cached
+                return None
+
+            self.misses += 1
+            self._entries.pop(key, None)
+            if 200 <= response.status_code < 300:
+                self._entries[key] = CacheEntry(key[1], response, ttl)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        response.cache_status = 'miss'
+        response.from_cache = False
+        return response
+
+    def invalidate(self, url: str):
+        """
+        使写请求路径对应资源的缓存失效: /api/v1/coupons/5/receive 会失效 /api/v1/coupons/5、
+        /api/v1/coupons/5/stock 以及列表 /api/v1/coupons；
+        不带ID的 /api/v1/coupons/batch-receive、/api/v1/coupons/use 会失效 /api/v1/coupons 下的全部缓存
+        """
+        path = urlsplit(url).path.rstrip('/')
+        segments = path.split('/')
+        template = normalize_endpoint(path).split('/')
+        id_positions = [i for i, segment in enumerate(template) if segment == '{id}']
+        if id_positions:
+            prefixes = ['/'.join(segments[:id_positions[-1] + 1])]
+            exact = {prefixes[0], '/'.join(segments[:id_positions[-1]])}
+        else:
+            prefixes = [c for c in self.collections if path == c or path.startswith(c + '/')]
+            exact = {path}
+
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry.path in exact or any(entry.path.startswith(prefix + '/') for prefix in prefixes)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    @staticmethod
+    def _copy(response: requests.Response, status: str) -> requests.Response:
+        cached = copy.copy(response)
+        cached.headers = copy.copy(response.headers)
+        # 各副本重新解析响应体，调用方修改 json() 结果不会影响缓存和其他副本
+        cached.__dict__.pop('_json_cache', None)
+        cached.cache_status = status
+        # 只有直接命中未经网络往返，重新验证(304)的耗时是真实请求耗时
+        cached.from_cache = status == 'hit'
+        return cached
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.revalidated + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.revalidated) / lookups, 4) if lookups else 0.0,
+            }
+
+    def log_stats(self):
+        stats = self.stats()
+        if stats['hits'] or stats['revalidated'] or stats['misses']:
+            log.info(f"响应缓存统计: {stats}")
@@ -0,0 +1,638 @@
+import copy
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from config.settings import settings
+from core.logger import log
+
+TEMPLATES_FILE = settings.data_dir / 'mock' / 'response_templates.json'
+
+
+class StubError(Exception):
+    def __init__(self, status: int, template: str, message: Optional[str] = None):
+        self.status = status
+        self.template = template
+        self.message = message
+        super().__init__(message or template)
+
+
+class FaultRule:
+    """
+    故障注入规则
+    :param pattern: 匹配请求路径的正则，None 表示所有请求
+    :param latency: 固定延迟（秒）
+    :param jitter: 额外随机延迟上限（秒）
+    :param error_rate: 返回错误状态码的概率
+    :param retry_after: 错误响应携带的 Retry-After 秒数
+    """
+
+    def __init__(
+        self,
+        pattern: Optional[str] = None,
+        method: Optional[str] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        retry_after: Optional[float] = None,
+    ):
+        self.pattern = re.compile(pattern) if pattern else None
+        self.method = method.upper() if method else None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.method and self.method != method:
+            return False
+        return self.pattern is None or bool(self.pattern.search(path))
+
+
+class StubState:
+    """
+    挡板的内存数据，所有修改都在同一把锁内完成，库存扣减不会超卖
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.ids = itertools.count(1)
+        self.users: Dict[int, Dict[str, Any]] = {}
+        self.tokens: Dict[str, int] = {}
+        self.refresh_tokens: Dict[str, int] = {}
+        self.coupons: Dict[int, Dict[str, Any]] = {}
+        self.user_coupons: Dict[str, Dict[str, Any]] = {}
+        self.activities: Dict[int, Dict[str, Any]] = {}
+        self.participants: Dict[int, List[int]] = {}
+
+    def next_id(self) -> int:
+        return next(self.ids)
+
+
+def _now(offset_days: int = 0) -> str:
+    return (datetime.now() + timedelta(days=offset_days)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _paginate(items: List[Dict[str, Any]], query: Dict[str, str]) -> Dict[str, Any]:
+    page = max(1, int(query.get('page', 1)))
+    page_size = max(1, int(query.get('page_size', 20)))
+    start = (page - 1) * page_size
+    return {
+        "items": items[start:start + page_size],
+        "total": len(items),
+        "page": page,
+        "page_size": page_size,
+    }
+
+
+class StubApp:
+    """
+    按 api/*.py 中使用的路由实现的有状态挡板，响应体取自 response_templates.json 中对应模板的 data 部分
+    :param envelope: True 时返回模板的完整结构（code/success/message/data），默认与测试用例一致返回扁平结构
+    """
+
+    def __init__(self, templates_file: Path = TEMPLATES_FILE, envelope: bool = False):
+        self.templates = json.loads(Path(templates_file).read_text(encoding='utf-8'))
+        self.envelope = envelope
+        self.state = StubState()
+        self.routes: List[Tuple[str, re.Pattern, Callable]] = []
+        self._register_routes()
+
+    def _register_routes(self):
+        routes = [
+            ('POST', r'/api/v1/auth/register', self.register),
+            ('POST', r'/api/v1/auth/login', self.login),
+            ('POST', r'/api/v1/auth/refresh', self.refresh),
+            ('POST', r'/api/v1/auth/logout', self.logout),
+            ('GET', r'/api/v1/auth/userinfo', self.userinfo),
+            ('POST', r'/api/v1/auth/change-password', self.change_password),
+
+            ('POST', r'/api/v1/users', self.create_user),
+            ('GET', r'/api/v1/users', self.list_users),
+            ('GET', r'/api/v1/users/(\d+)', self.get_user),
+            ('PUT', r'/api/v1/users/(\d+)', self.update_user),
+            ('DELETE', r'/api/v1/users/(\d+)', self.delete_user),
+            ('GET', r'/api/v1/users/(\d+)/assets', self.user_assets),
+            ('POST', r'/api/v1/users/(\d+)/verify-identity', self.verify_identity),
+
+            ('POST', r'/api/v1/coupons', self.create_coupon),
+            ('GET', r'/api/v1/coupons', self.list_coupons),
+            ('GET', r'/api/v1/coupons/user', self.user_coupons),
+            ('POST', r'/api/v1/coupons/use', self.use_coupon),
+            ('POST', r'/api/v1/coupons/batch-receive', self.batch_receive),
+            ('GET', r'/api/v1/coupons/(\d+)', self.get_coupon),
+            ('PUT', r'/api/v1/coupons/(\d+)', self.update_coupon),
+            ('DELETE', r'/api/v1/coupons/(\d+)', self.delete_coupon),
+            ('POST', r'/api/v1/coupons/(\d+)/receive', self.receive_coupon),
+            ('GET', r'/api/v1/coupons/(\d+)/stock', self.coupon_stock),
+
+            ('POST', r'/api/v1/activities', self.create_activity),
+            ('GET', r'/api/v1/activities', self.list_activities),
+            ('GET', r'/api/v1/activities/user', self.user_activities),
+            ('GET', r'/api/v1/activities/(\d+)', self.get_activity),
+            ('PUT', r'/api/v1/activities/(\d+)', self.update_activity),
+            ('DELETE', r'/api/v1/activities/(\d+)', self.delete_activity),
+            ('POST', r'/api/v1/activities/(\d+)/participate', self.participate),
+            ('GET', r'/api/v1/activities/(\d+)/participants', self.activity_participants),
+            ('POST', r'/api/v1/activities/(\d+)/publish', self.publish_activity),
+            ('POST', r'/api/v1/activities/(\d+)/offline', self.offline_activity),
+        ]
+        for method, pattern, handler in routes:
+            self.routes.append((method, re.compile(f'^{pattern}$'), handler))
+
+    def dispatch(self, method: str, path: str, query: Dict[str, str], body: Dict[str, Any], token: Optional[str]) -> Tuple[int, Any]:
+        path_matched = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if not match:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            try:
+                return handler(*[int(group) for group in match.groups()], query=query, body=body, token=token)
+            except StubError as e:
+                return e.status, self.error(e.template, e.message)
+            except (TypeError, KeyError, ValueError) as e:
+                # 字段类型不对等请求体问题，真实后端会返回 400 而不是断开连接
+                return 400, self.error('error_response', f'请求参数不合法: {type(e).__name__}: {e}')
+            except Exception as e:
+                log.exception(f"挡板处理请求异常: {method} {path}")
+                return 500, self.error('error_response', f'服务内部错误: {e}')
+        if path_matched:
+            return 405, self.error('error_response', f'不支持的请求方法: {method}')
+        return 404, self.error('not_found_response', f'接口不存在: {path}')
+
+    def render(self, template: str, data: Any, message: Optional[str] = None) -> Any:
+        if not self.envelope:
+            return data
+        body = copy.deepcopy(self.templates[template])
+        body['data'] = data
+        if message:
+            body['message'] = message
+        return body
+
+    def error(self, template: str, message: Optional[str] = None) -> Dict[str, Any]:
+        body = copy.deepcopy(self.templates[template])
+        if message:
+            body['message'] = message
+        return body
+
+    def _template_data(self, template: str) -> Dict[str, Any]:
+        return copy.deepcopy(self.templates[template].get('data', {}))
+
+    @staticmethod
+    def _require(body: Dict[str, Any], *fields: str):
+        missing = [field for field in fields if body.get(field) in (None, '')]
+        if missing:
+            raise StubError(400, 'validation_error_response', f"缺少必填字段: {', '.join(missing)}")
+
+    @staticmethod
+    def _get(table: Dict[int, Dict[str, Any]], entity_id: int, name: str) -> Dict[str, Any]:
+        entity = table.get(entity_id)
+        if entity is None:
+            raise StubError(404, 'not_found_response', f'{name}不存在: {entity_id}')
+        return entity
+
+    def _current_user(self, token: Optional[str]) -> Dict[str, Any]:
+        user_id = self.state.tokens.get(token or '')
+        if user_id is None or user_id not in self.state.users:
+            raise StubError(401, 'unauthorized_response')
+        return self.state.users[user_id]
+
+    def _issue_tokens(self, user_id: int) -> Dict[str, Any]:
+        token, refresh_token = uuid.uuid4().hex, uuid.uuid4().hex
+        self.state.tokens[token] = user_id
+        self.state.refresh_tokens[refresh_token] = user_id
+        return {"token": token, "refresh_token": refresh_token, "expires_in": 7200}
+
+    # ---------------- 认证 ----------------
+
+    def register(self, query, body, token):
+        self._require(body, 'username', 'password')
+        with self.state.lock:
+            if any(user['username'] == body['username'] for user in self.state.users.values()):
+                raise StubError(400, 'error_response', '用户名已存在')
+            user = dict(body, id=self.state.next_id(), created_at=_now())
+            self.state.users[user['id']] = user
+        return 201, self.render('success_response', user, '注册成功')
+
+    def login(self, query, body, token):
+        self._require(body, 'username', 'password')
+        with self.state.lock:
+            user = next((u for u in self.state.users.values() if u['username'] == body['username']), None)
+            if user is None or user.get('password') != body['password']:
+                raise StubError(401, 'unauthorized_response', '用户名或密码错误')
+            data = self._template_data('login_response')
+            data.update(self._issue_tokens(user['id']))
+            data['user_info'] = {key: user.get(key) for key in ('id', 'username', 'mobile')}
+        return 200, self.render('login_response', data)
+
+    def refresh(self, query, body, token):
+        self._require(body, 'refresh_token')
+        with self.state.lock:
+            user_id = self.state.refresh_tokens.pop(body['refresh_token'], None)
+            if user_id is None:
+                raise StubError(401, 'unauthorized_response', 'refresh_token无效')
+            data = self._issue_tokens(user_id)
+        return 200, self.render('login_response', data, '刷新成功')
+
+    def logout(self, query, body, token):
+        with self.state.lock:
+            self.state.tokens.pop(token or '', None)
+        return 200, self.render('success_response', {}, '登出成功')
+
+    def userinfo(self, query, body, token):
+        with self.state.lock:
+            user = self._current_user(token)
+        return 200, self.render('success_response', {k: v for k, v in user.items() if k != 'password'})
+
+    def change_password(self, query, body, token):
+        self._require(body, 'old_password', 'new_password')
+        with self.state.lock:
+            user = self._current_user(token)
+            if user.get('password') != body['old_password']:
+                raise StubError(400, 'error_response', '原密码错误')
+            user['password'] = body['new_password']
+        return 200, self.render('success_response', {}, '修改成功')
+
+    # ---------------- 用户 ----------------
+
+    def create_user(self, query, body, token):
+        return self.register(query, body, token)
+
+    def list_users(self, query, body, token):
+        with self.state.lock:
+            users = [{k: v for k, v in user.items() if k != 'password'} for user in self.state.users.values()]
+        return 200, self.render('success_response', _paginate(users, query))
+
+    def get_user(self, user_id, query, body, token):
+        with self.state.lock:
+            user = self._get(self.state.users, user_id, '用户')
+            return 200, self.render('success_response', {k: v for k, v in user.items() if k != 'password'})
+
+    def update_user(self, user_id, query, body, token):
+        with self.state.lock:
+            user = self._get(self.state.users, user_id, '用户')
+            user.update({k: v for k, v in body.items() if k != 'id'})
+            return 200, self.render('success_response', dict(user))
+
+    def delete_user(self, user_id, query, body, token):
+        with self.state.lock:
+            self._get(self.state.users, user_id, '用户')
+            del self.state.users[user_id]
+        return 200, self.render('success_response', {"id": user_id})
+
+    def user_assets(self, user_id, query, body, token):
+        with self.state.lock:
+            self._get(self.state.users, user_id, '用户')
+            coupons = [c for c in self.state.user_coupons.values() if c['user_id'] == user_id]
+        data = {
+            "user_id": user_id,
+            "coupons": len(coupons),
+            "unused_coupons": sum(1 for c in coupons if c['status'] == 'unused'),
+        }
+        return 200, self.render('success_response', data)
+
+    def verify_identity(self, user_id, query, body, token):
+        self._require(body, 'real_name', 'id_card')
+        with self.state.lock:
+            user = self._get(self.state.users, user_id, '用户')
+            user['verified'] = True
+        return 200, self.render('success_response', {"user_id": user_id, "verified": True}, '认证成功')
+
+    # ---------------- 卡券 ----------------
+
+    def create_coupon(self, query, body, token):
+        self._require(body, 'name', 'type', 'amount', 'total_stock')
+        if body['amount'] <= 0:
+            raise StubError(400, 'validation_error_response')
+        with self.state.lock:
+            coupon = self._template_data('coupon_create_response')
+            coupon.update(body)
+            coupon['id'] = self.state.next_id()
+            coupon['available_stock'] = min(int(body.get('available_stock', body['total_stock'])), int(body['total_stock']))
+            self.state.coupons[coupon['id']] = coupon
+        return 201, self.render('coupon_create_response', coupon)
+
+    def list_coupons(self, query, body, token):
+        with self.state.lock:
+            coupons = [c for c in self.state.coupons.values() if query.get('status') in (None, c['status'])]
+        return 200, self.render('success_response', _paginate(coupons, query))
+
+    def get_coupon(self, coupon_id, query, body, token):
+        with self.state.lock:
+            return 200, self.render('success_response', dict(self._get(self.state.coupons, coupon_id, '卡券')))
+
+    def update_coupon(self, coupon_id, query, body, token):
+        with self.state.lock:
+            coupon = self._get(self.state.coupons, coupon_id, '卡券')
+            coupon.update({k: v for k, v in body.items() if k != 'id'})
+            return 200, self.render('success_response', dict(coupon))
+
+    def delete_coupon(self, coupon_id, query, body, token):
+        with self.state.lock:
+            self._get(self.state.coupons, coupon_id, '卡券')
+            del self.state.coupons[coupon_id]
+        return 200, self.render('success_response', {"id": coupon_id})
+
+    def coupon_stock(self, coupon_id, query, body, token):
+        with self.state.lock:
+            coupon = self._get(self.state.coupons, coupon_id, '卡券')
+            data = {key: coupon[key] for key in ('id', 'total_stock', 'available_stock')}
+        return 200, self.render('success_response', data)
+
+    def _receive(self, coupon_id: int, user_id: int) -> Dict[str, Any]:
+        coupon = self._get(self.state.coupons, coupon_id, '卡券')
+        if coupon.get('status') != 'active':
+            raise StubError(400, 'error_response', '卡券不可领取')
+        if any(c['coupon_id'] == coupon_id and c['user_id'] == user_id for c in self.state.user_coupons.values()):
+            raise StubError(400, 'error_response', '已领取过该卡券')
+        if coupon['available_stock'] <= 0:
+            raise StubError(400, 'error_response', '库存不足')
+        coupon['available_stock'] -= 1
+        record = self._template_data('coupon_receive_response')
+        record.update(
+            coupon_id=coupon_id,
+            user_id=user_id,
+            coupon_code=f"CPN{uuid.uuid4().hex[:16].upper()}",
+            status='unused',
+            receive_time=_now(),
+            expire_time=coupon.get('end_time') or _now(30),
+        )
+        self.state.user_coupons[record['coupon_code']] = record
+        return record
+
+    def receive_coupon(self, coupon_id, query, body, token):
+        self._require(body, 'user_id')
+        with self.state.lock:
+            record = self._receive(coupon_id, body['user_id'])
+        return 200, self.render('coupon_receive_response', dict(record))
+
+    def batch_receive(self, query, body, token):
+        self._require(body, 'coupon_ids', 'user_id')
+        results = []
+        with self.state.lock:
+            for coupon_id in body['coupon_ids']:
+                try:
+                    results.append(dict(self._receive(int(coupon_id), body['user_id']), success=True))
+                except StubError as e:
+                    results.append({"coupon_id": coupon_id, "success": False, "message": e.message})
+                except (TypeError, ValueError) as e:
+                    results.append({"coupon_id": coupon_id, "success": False, "message": f"卡券ID不合法: {e}"})
+        return 200, self.render('success_response', {"results": results})
+
+    def user_coupons(self, query, body, token):
+        if 'user_id' not in query:
+            raise StubError(400, 'validation_error_response', '缺少必填字段: user_id')
+        with self.state.lock:
+            coupons = [
+                dict(c) for c in self.state.user_coupons.values()
+                if str(c['user_id']) == query['user_id'] and query.get('status') in (None, c['status'])
+            ]
+        return 200, self.render('success_response', _paginate(coupons, query))
+
+    def use_coupon(self, query, body, token):
+        self._require(body, 'coupon_code')
+        order_amount = float((body.get('order_data') or {}).get('amount') or 0)
+        with self.state.lock:
+            record = self.state.user_coupons.get(body['coupon_code'])
+            if record is None:
+                raise StubError(404, 'not_found_response', '卡券码不存在')
+            if record['status'] != 'unused':
+                raise StubError(400, 'error_response', '卡券已使用')
+            coupon = self.state.coupons.get(record['coupon_id'], {})
+            amount = float(coupon.get('amount', 0))
+            if order_amount < float(coupon.get('min_order_amount') or 0) or order_amount <= amount:
+                raise StubError(400, 'error_response', '订单金额不满足使用条件')
+            record['status'] = 'used'
+            data = self._template_data('coupon_use_response')
+            data.update(
+                coupon_code=record['coupon_code'],
+                discount_amount=amount,
+                order_no=(body.get('order_data') or {}).get('order_no', data.get('order_no')),
+            )
+        return 200, self.render('coupon_use_response', data)
+
+    # ---------------- 活动 ----------------
+
+    def create_activity(self, query, body, token):
+        self._require(body, 'title', 'start_time', 'end_time')
+        with self.state.lock:
+            activity = self._template_data('activity_create_response')
+            activity.update(body)
+            activity.update(id=self.state.next_id(), status='draft', current_participants=0, created_at=_now())
+            self.state.activities[activity['id']] = activity
+            self.state.participants[activity['id']] = []
+        return 201, self.render('activity_create_response', activity)
+
+    def list_activities(self, query, body, token):
+        with self.state.lock:
+            activities = [a for a in self.state.activities.values() if query.get('status') in (None, a['status'])]
+        return 200, self.render('success_response', _paginate(activities, query))
+
+    def user_activities(self, query, body, token):
+        user_id = int(query.get('user_id', 0))
+        with self.state.lock:
+            activities = [
+                self.state.activities[activity_id] for activity_id, users in self.state.participants.items()
+                if user_id in users and activity_id in self.state.activities
+            ]
+        return 200, self.render('success_response', _paginate(activities, query))
+
+    def get_activity(self, activity_id, query, body, token):
+        with self.state.lock:
+            return 200, self.render('success_response', dict(self._get(self.state.activities, activity_id, '活动')))
+
+    def update_activity(self, activity_id, query, body, token):
+        with self.state.lock:
+            activity = self._get(self.state.activities, activity_id, '活动')
+            activity.update({k: v for k, v in body.items() if k not in ('id', 'status')})
+            return 200, self.render('success_response', dict(activity))
+
+    def delete_activity(self, activity_id, query, body, token):
+        with self.state.lock:
+            self._get(self.state.activities, activity_id, '活动')
+            del self.state.activities[activity_id]
+            self.state.participants.pop(activity_id, None)
+        return 200, self.render('success_response', {"id": activity_id})
+
+    def _set_activity_status(self, activity_id: int, status: str, allowed_from: Tuple[str, ...]):
+        with self.state.lock:
+            activity = self._get(self.state.activities, activity_id, '活动')
+            if activity['status'] not in allowed_from:
+                raise StubError(400, 'error_response', f"活动当前状态为 {activity['status']}，不能变更为 {status}")
+            activity['status'] = status
+            return 200, self.render('success_response', dict(activity))
+
+    def publish_activity(self, activity_id, query, body, token):
+        return self._set_activity_status(activity_id, 'published', ('draft', 'offline'))
+
+    def offline_activity(self, activity_id, query, body, token):
+        return self._set_activity_status(activity_id, 'offline', ('published',))
+
+    def participate(self, activity_id, query, body, token):
+        self._require(body, 'user_id')
+        with self.state.lock:
+            activity = self._get(self.state.activities, activity_id, '活动')
+            if activity['status'] != 'published':
+                raise StubError(400, 'error_response', '活动未发布')
+            users = self.state.participants[activity_id]
+            if body['user_id'] in users:
+                raise StubError(400, 'error_response', '已参与该活动')
+            if activity.get('max_participants') and len(users) >= activity['max_participants']:
+                raise StubError(400, 'error_response', '活动参与人数已满')
+            users.append(body['user_id'])
+            activity['current_participants'] = len(users)
+            data = {"activity_id": activity_id, "user_id": body['user_id'], "participate_time": _now()}
+        return 200, self.render('success_response', data, '参与成功')
+
+    def activity_participants(self, activity_id, query, body, token):
+        with self.state.lock:
+            self._get(self.state.activities, activity_id, '活动')
+            users = list(self.state.participants[activity_id])
+        return 200, self.render('success_response', {"activity_id": activity_id, "count": len(users), "user_ids": users})
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'StubServer/1.0'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        stub: StubServer = self.server.stub
+        parts = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        fault = stub.fault_for(self.command, parts.path)
+        if fault is not None:
+            delay = fault.latency + (random.uniform(0, fault.jitter) if fault.jitter else 0)
+            if delay:
+                time.sleep(delay)
+            if fault.error_rate and random.random() < fault.error_rate:
+                headers = {'Retry-After': str(fault.retry_after)} if fault.retry_after is not None else {}
+                stub.record(fault.error_status)
+                return self._reply(fault.error_status, stub.app.error('error_response', '挡板注入的错误'), headers)
+
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            return self._reply(400, stub.app.error('error_response', '请求体不是合法的JSON'))
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        authorization = self.headers.get('Authorization', '')
+        token = authorization.split(' ', 1)[-1] if authorization else None
+
+        status, payload = stub.app.dispatch(self.command, parts.path, query, body if isinstance(body, dict) else {}, token)
+        content = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = {}
+        if self.command == 'GET' and status == 200:
+            headers['ETag'] = f'"{hashlib.sha1(content).hexdigest()[:16]}"'
+            if self.headers.get('If-None-Match') == headers['ETag']:
+                status, content = 304, b''
+        stub.record(status)
+        self._reply(status, content, headers)
+
+    def _reply(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+        content = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = do_HEAD = _handle
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    # 默认监听队列只有 5，并发突发建连时会被丢弃 SYN 并等待重传
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class StubServer:
+    """
+    进程内多线程挡板服务，离线压测 HttpClient 吞吐或在无后端时跑接口用例
+    用法:
+        with StubServer(faults=[FaultRule(latency=0.01)]) as stub:
+            client = HttpClient(stub.url)
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        templates_file: Path = TEMPLATES_FILE,
+        envelope: bool = False,
+        faults: Optional[List[FaultRule]] = None,
+    ):
+        self.app = StubApp(templates_file, envelope)
+        self.faults: List[FaultRule] = list(faults or [])
+        self.status_counts: Dict[int, int] = {}
+        self._counts_lock = threading.Lock()
+        self._httpd = _StubHTTPServer((host, port), _StubRequestHandler)
+        self._httpd.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_fault(self, rule: FaultRule) -> FaultRule:
+        self.faults.append(rule)
+        return rule
+
+    def clear_faults(self):
+        self.faults.clear()
+
+    def fault_for(self, method: str, path: str) -> Optional[FaultRule]:
+        for rule in reversed(self.faults):
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    def record(self, status: int):
+        with self._counts_lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def start(self) -> 'StubServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='stub-server', daemon=True)
+        self._thread.start()
+        log.info(f"挡板服务已启动: {self.url}")
+        return self
+
+    def serve_forever(self):
+        log.info(f"挡板服务已启动: {self.url}")
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        log.info(f"挡板服务已停止, 响应状态统计: {self.status_counts}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from core.logger import log
+from utils.data_generator import data_generator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 下没有 fcntl
+    fcntl = None
+    import msvcrt
+
+
+@dataclass
+class TokenLease:
+    slot: int
+    user_id: Any
+    username: str
+    password: str
+    token: str
+    refresh_token: Optional[str]
+    expires_at: float
+    invalidated: bool = False
+
+
+class TokenPool:
+    """
+    会话级登录态池: 每个池内用户只注册、登录一次，各测试独占租用一个用户的 token，用完归还
+    存储为带文件锁的 JSON 文件，xdist 多个 worker 共享同一个池；token 临近过期时用 refresh_token 主动刷新
+    :param size: 池内最多创建的用户数，租用时无空闲用户且池已满则等待归还
+    :param refresh_margin: 距离过期不足该秒数时刷新 token
+    """
+
+    def __init__(self, store_file: Path, size: int = 8, refresh_margin: float = 300, wait_timeout: float = 60):
+        self.store_file = Path(store_file)
+        self.lock_file = self.store_file.with_suffix('.lock')
+        self.size = size
+        self.refresh_margin = refresh_margin
+        self.wait_timeout = wait_timeout
+        self.owner = f"{os.getpid()}:{os.getenv('PYTEST_XDIST_WORKER', 'main')}"
+        self._thread_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "TokenPool":
+        return cls(
+            store_file=settings.reports_dir / '.token_pool.json',
+            size=int(os.getenv('TOKEN_POOL_SIZE', config.get('size', 8))),
+            refresh_margin=float(config.get('refresh_margin', 300)),
+            wait_timeout=float(config.get('wait_timeout', 60)),
+        )
+
+    @contextmanager
+    def _locked(self):
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._thread_lock, open(self.lock_file, 'a+') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                slots = json.loads(self.store_file.read_text(encoding='utf-8')) if self.store_file.exists() else []
+                yield slots
+                tmp_file = self.store_file.with_suffix('.tmp')
+                tmp_file.write_text(json.dumps(slots, ensure_ascii=False), encoding='utf-8')
+                os.replace(tmp_file, self.store_file)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def reset(self):
+        """
+        清空上一次会话遗留的池，只应由主进程（或非xdist运行）在会话开始时调用
+        """
+        self.store_file.unlink(missing_ok=True)
+
+    @staticmethod
+    def _owner_alive(owner: str) -> bool:
+        try:
+            os.kill(int(owner.split(':', 1)[0]), 0)
+        except (ValueError, ProcessLookupError):
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _reserve(self) -> Optional[Dict[str, Any]]:
+        with self._locked() as slots:
+            for slot in slots:
+                if slot.get('leased_by') and not self._owner_alive(slot['leased_by']):
+                    log.warning(f"回收异常退出进程租用的登录态: {slot.get('username')} ({slot['leased_by']})")
+                    slot['leased_by'] = None
+            free = next((s for s in slots if not s.get('leased_by')), None)
+            if free is None and len(slots) < self.size:
+                free = {"slot": len(slots)}
+                slots.append(free)
+            if free is not None:
+                free['leased_by'] = self.owner
+                return dict(free)
+        return None
+
+    def lease(self, auth_api) -> Optional[TokenLease]:
+        deadline = time.monotonic() + self.wait_timeout
+        slot = self._reserve()
+        while slot is None:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"等待登录态池超时({self.wait_timeout}s)，池大小 {self.size} 已全部被占用")
+            time.sleep(0.05)
+            slot = self._reserve()
+
+        try:
+            if not slot.get('username'):
+                slot.update(self._create_user(auth_api))
+            elif not slot.get('token') or slot['expires_at'] - time.time() < self.refresh_margin:
+                slot.update(self._refresh(auth_api, slot))
+        except Exception:
+            self._write(slot['slot'], {"leased_by": None})
+            raise
+        if not slot.get('token'):
+            self._write(slot['slot'], dict(slot, leased_by=None))
+            return None
+
+        return TokenLease(**{field: slot.get(field) for field in TokenLease.__dataclass_fields__ if field != 'invalidated'})
+
+    def release(self, lease: TokenLease, discard: bool = False):
+        """
+        :param discard: 测试中执行了登出/改密等操作使 token 失效时传 True（或设置 lease.invalidated），下次租用会重新登录
+        """
+        fields = asdict(lease)
+        fields.pop('slot')
+        invalidated = fields.pop('invalidated')
+        fields['leased_by'] = None
+        if discard or invalidated:
+            fields['expires_at'] = 0
+        self._write(lease.slot, fields)
+
+    def _write(self, index: int, fields: Dict[str, Any]):
+        with self._locked() as slots:
+            slots[index].update(fields)
+
+    def _login(self, auth_api, username: str, password: str) -> Dict[str, Any]:
+        response = auth_api.login(username, password)
+        if response.status_code != 200:
+            log.error(f"登录态池用户登录失败: {response.text}")
+            return {"token": None}
+        body = response.json()
+        return {
+            "token": body.get('token'),
+            "refresh_token": body.get('refresh_token'),
+            "expires_at": time.time() + float(body.get('expires_in') or 7200),
+        }
+
+    def _create_user(self, auth_api) -> Dict[str, Any]:
+        user_data = data_generator.generate_user_data()
+        response = auth_api.register(user_data)
+        if response.status_code != 201:
+            log.error(f"登录态池创建用户失败: {response.text}")
+            return {}
+        user_info = response.json()
+        fields = {
+            "user_id": user_info.get('id'),
+            "username": user_data['username'],
+            "password": user_data['password'],
+        }
+        fields.update(self._login(auth_api, fields['username'], fields['password']))
+        log.info(f"登录态池新增用户: {fields['username']}")
+        return fields
+
+    def _refresh(self, auth_api, slot: Dict[str, Any]) -> Dict[str, Any]:
+        if slot.get('refresh_token'):
+            response = auth_api.refresh_token(slot['refresh_token'])
+            if response.status_code == 200:
+                body = response.json()
+                log.info(f"登录态池刷新token: {slot['username']}")
+                return {
+                    "token": body.get('token'),
+                    "refresh_token": body.get('refresh_token', slot['refresh_token']),
+                    "expires_at": time.time() + float(body.get('expires_in') or 7200),
+                }
+            log.warning(f"刷新token失败，重新登录: {slot['username']}, {response.text}")
+        return self._login(auth_api, slot['username'], slot['password'])
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._locked() as slots:
+            return [{k: v for k, v in slot.items() if k in ('slot', 'username', 'leased_by', 'expires_at')} for slot in slots]
+
+
+token_pool = TokenPool.from_config(settings.token_pool_config)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import argparse
+import random
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def build_journeys(args):
+    from api.activity_api import ActivityAPI
+    from api.coupon_api import CouponAPI
+    from core.load import Journey
+
+    def browse_coupons(vu):
+        coupon_api = vu.api(CouponAPI)
+        coupon_api.get_coupon_list({"page": 1, "page_size": 20})
+        coupon_api.get_coupon_detail(args.coupon_id)
+        coupon_api.get_coupon_stock(args.coupon_id)
+
+    def receive_and_use_coupon(vu):
+        coupon_api = vu.api(CouponAPI)
+        user_id = args.user_id_base + random.randint(0, args.user_id_range)
+        response = coupon_api.receive_coupon(args.coupon_id, user_id)
+        if response.status_code == 200:
+            coupon_code = response.json().get('coupon_code')
+            if coupon_code:
+                coupon_api.use_coupon(coupon_code, {"amount": 500})
+
+    def participate_activity(vu):
+        activity_api = vu.api(ActivityAPI)
+        user_id = args.user_id_base + random.randint(0, args.user_id_range)
+        activity_api.get_activity_detail(args.activity_id)
+        activity_api.participate_activity(args.activity_id, user_id)
+
+    journeys = [
+        Journey("浏览卡券", browse_coupons, weight=args.browse_weight),
+        Journey("领取并使用卡券", receive_and_use_coupon, weight=args.receive_weight),
+    ]
+    if args.activity_id:
+        journeys.append(Journey("参与活动", participate_activity, weight=args.activity_weight))
+    return [journey for journey in journeys if journey.weight > 0]
+
+
+def run_load(args):
+    from config.settings import settings
+    from core.load import LoadRunner, format_report, ramp_profile
+
+    base_url = args.base_url or settings.base_url
+    runner = LoadRunner(
+        base_url=base_url,
+        journeys=build_journeys(args),
+        stages=ramp_profile(args.users, args.ramp_up, args.duration, args.ramp_down),
+        target_rps=args.rps,
+        think_time=args.think_time,
+        timeout=settings.timeout,
+    )
+
+    print(f"压测目标: {base_url}, 虚拟用户: {args.users}, 目标RPS: {args.rps or '不限'}")
+    print("=" * 80)
+    report = runner.run()
+    print(format_report(report))
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"压测报告已保存: {output}")
+
+    if args.max_error_rate is not None and report['error_rate'] > args.max_error_rate:
+        print(f"错误率 {report['error_rate']:.2%} 超过阈值 {args.max_error_rate:.2%}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='接口压测执行脚本')
+
+    parser.add_argument('--env', default='test', help='指定测试环境: dev/test/staging/prod')
+    parser.add_argument('--base-url', help='压测地址，默认使用环境配置中的 base_url')
+    parser.add_argument('-u', '--users', type=int, default=10, help='虚拟用户数')
+    parser.add_argument('--ramp-up', type=float, default=10, help='加压时长（秒）')
+    parser.add_argument('-d', '--duration', type=float, default=60, help='稳定压测时长（秒）')
+    parser.add_argument('--ramp-down', type=float, default=5, help='减压时长（秒）')
+    parser.add_argument('--rps', type=float, help='目标RPS，不指定则不限速')
+    parser.add_argument('--think-time', type=float, default=0.0, help='旅程间隔（秒）')
+    parser.add_argument('--coupon-id', type=int, default=1, help='压测使用的卡券ID')
+    parser.add_argument('--activity-id', type=int, default=0, help='压测使用的活动ID，0表示不压测活动')
+    parser.add_argument('--user-id-base', type=int, default=100000, help='虚拟用户ID起始值')
+    parser.add_argument('--user-id-range', type=int, default=100000, help='虚拟用户ID随机范围')
+    parser.add_argument('--browse-weight', type=int, default=6, help='浏览卡券旅程权重')
+    parser.add_argument('--receive-weight', type=int, default=3, help='领取并使用卡券旅程权重')
+    parser.add_argument('--activity-weight', type=int, default=1, help='参与活动旅程权重')
+    parser.add_argument('--max-error-rate', type=float, help='错误率阈值，超过则返回非0退出码')
+    parser.add_argument('-o', '--output', default=str(BASE_DIR / 'reports' / 'load_report.json'), help='压测报告输出路径')
+
+    args = parser.parse_args()
+
+    os.environ['TEST_ENV'] = args.env
+    print(f"测试环境: {args.env}")
+    print("=" * 80)
+
+    exit_code = run_load(args)
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import os
+import sys
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='执行 data/sql 下的 SQL 脚本并批量导入测试数据')
+
+    parser.add_argument('--env', default='test', help='指定测试环境: dev/test/staging/prod')
+    parser.add_argument('-s', '--script', action='append', default=[], help='要执行的 SQL 脚本，可多次指定，如 setup.sql')
+    parser.add_argument('-l', '--load', action='append', default=[], help='要导入的 YAML/CSV 数据文件，可多次指定')
+    parser.add_argument('-t', '--table', help='数据文件为行列表或 CSV 文件名不是表名时指定目标表')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='多行 INSERT 每条语句的行数')
+    parser.add_argument('--infile', action='store_true', help='CSV 使用 LOAD DATA LOCAL INFILE 导入（需在 db_config.yaml 中开启 local_infile）')
+    parser.add_argument('--continue-on-error', action='store_true', help='脚本中某条语句失败时继续执行后续语句')
+
+    args = parser.parse_args()
+    if not args.script and not args.load:
+        parser.error('至少指定一个 --script 或 --load')
+
+    os.environ['TEST_ENV'] = args.env
+    print(f"测试环境: {args.env}")
+
+    from config.settings import settings
+    from core.database import DatabaseHelper
+
+    if settings.db_backend == 'sqlite':
+        if settings.db_sqlite_file == ':memory:':
+            parser.error('SQLite 内存库随脚本退出销毁，请通过 DB_SQLITE_FILE 指定数据库文件')
+        if args.infile:
+            parser.error('SQLite 不支持 LOAD DATA LOCAL INFILE，请去掉 --infile')
+        helper = DatabaseHelper.sqlite(settings.db_sqlite_file, schema=None, pool_config=settings.db_pool_config)
+    else:
+        # LOCAL INFILE 允许服务端读取客户端文件，只能由环境配置开启，命令行参数不能绕过
+        if args.infile and not settings.db_local_infile:
+            parser.error(f'{args.env} 环境未开启 local_infile，请在 db_config.yaml 中配置后再使用 --infile')
+        helper = DatabaseHelper(
+            host=settings.db_host,
+            port=settings.db_port,
+            user=settings.db_user,
+            password=settings.db_password,
+            database=settings.db_database,
+            pool_config=settings.db_pool_config,
+            local_infile=settings.db_local_infile,
+        )
+    try:
+        for script in args.script:
+            helper.run_script(script, stop_on_error=not args.continue_on_error)
+        for fixture_file in args.load:
+            loaded = helper.load_fixture(fixture_file, table=args.table, chunk_size=args.chunk_size, use_infile=args.infile)
+            print(f"导入完成: {fixture_file} -> {loaded}")
+    finally:
+        helper.close()
+
+
+if __name__ == '__main__':
+    main()
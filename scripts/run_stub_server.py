@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+import sys
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地挡板服务（基于 data/mock/response_templates.json）')
+
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8000, help='监听端口')
+    parser.add_argument('--envelope', action='store_true', help='返回 code/success/message/data 完整结构')
+    parser.add_argument('--latency-ms', type=float, default=0, help='每个请求的固定延迟（毫秒）')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='额外随机延迟上限（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0, help='随机返回错误的概率 0~1')
+    parser.add_argument('--error-status', type=int, default=503, help='注入错误的状态码')
+    parser.add_argument('--retry-after', type=float, help='注入错误携带的 Retry-After 秒数')
+    parser.add_argument('--path', help='只对匹配该正则的路径注入延迟/错误')
+
+    args = parser.parse_args()
+
+    from core.stub_server import FaultRule, StubServer
+
+    faults = []
+    if args.latency_ms or args.jitter_ms or args.error_rate:
+        faults.append(FaultRule(
+            pattern=args.path,
+            latency=args.latency_ms / 1000,
+            jitter=args.jitter_ms / 1000,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            retry_after=args.retry_after,
+        ))
+
+    server = StubServer(args.host, args.port, envelope=args.envelope, faults=faults)
+    print(f"挡板服务地址: {server.url}")
+    print(f"执行用例: BASE_URL={server.url} python scripts/run_tests.py -p testcases/test_coupon")
+    print("=" * 80)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
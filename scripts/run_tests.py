@@ -77,10 +77,17 @@ def main():
     parser.add_argument('--html', action='store_true', help='生成HTML报告')
     parser.add_argument('--allure-report', action='store_true', help='生成Allure报告')
     parser.add_argument('--env', default='test', help='指定测试环境: dev/test/staging/prod')
+    parser.add_argument('--cassette', choices=['off', 'record', 'replay'], help='接口录制/回放模式')
+    parser.add_argument('--stub', action='store_true', help='启动本地挡板服务并以其作为被测后端')
     
     args = parser.parse_args()
     
     os.environ['TEST_ENV'] = args.env
+    if args.cassette:
+        os.environ['HTTP_CASSETTE'] = args.cassette
+        print(f"接口录制/回放模式: {args.cassette}")
+    if args.stub:
+        os.environ['STUB_SERVER'] = '1'
     print(f"测试环境: {args.env}")
     print("=" * 80)
     
@@ -1,3 +1,5 @@
+import os
+import time
 import pytest
 from api.auth_api import AuthAPI
 from api.coupon_api import CouponAPI
@@ -6,10 +8,37 @@ from api.user_api import UserAPI
 from core.database import DatabaseHelper
 from config.settings import settings
 from utils.data_generator import data_generator
-from core.logger import log
+from core.cassette import cassette_library
+from core.entity_pool import EntityPool, entity_pool_enabled, expected_per_worker
+from core.entity_registry import EntityRegistry, db_cleanup_enabled
+from core.http_log_policy import http_log_policy
+from core.logger import log, logger_manager
+from core.latency_baseline import latency_baseline
+from core.metrics import latency_recorder
+from core.stub_server import StubServer
+from core.token_pool import TokenLease, token_pool
 import allure
 
 
+def _stub_server_enabled() -> bool:
+    return os.getenv('STUB_SERVER', '').lower() in ('1', 'true', 'yes')
+
+
+def pytest_configure(config):
+    if os.getenv('PYTEST_XDIST_WORKER'):
+        return
+    token_pool.reset()
+    if _stub_server_enabled():
+        config.stub_server = StubServer().start()
+        os.environ['BASE_URL'] = config.stub_server.url
+
+
+def pytest_unconfigure(config):
+    stub_server = getattr(config, 'stub_server', None)
+    if stub_server is not None:
+        stub_server.stop()
+
+
 @pytest.fixture(scope="session")
 def auth_api():
     api = AuthAPI()
@@ -36,6 +65,14 @@ def user_api():
 
 @pytest.fixture(scope="session")
 def db_helper():
+    if _stub_server_enabled() or cassette_library.mode == 'replay':
+        log.warning("后端为挡板服务或录制回放，数据库与接口数据不对应，跳过数据库fixture")
+        yield None
+        return
+    if settings.db_backend == 'sqlite':
+        log.warning("SQLite 为本地离线库，与被测服务数据不对应，跳过数据库fixture；离线数据库用例请使用 offline_db")
+        yield None
+        return
     if not settings.db_database:
         log.warning("数据库配置未设置，跳过数据库fixture")
         yield None
@@ -46,44 +83,169 @@ def db_helper():
         port=settings.db_port,
         user=settings.db_user,
         password=settings.db_password,
-        database=settings.db_database
+        database=settings.db_database,
+        pool_config=settings.db_pool_config,
+        local_infile=settings.db_local_infile,
     )
     yield helper
+    helper.close()
+
+
+@pytest.fixture(scope="session")
+def offline_db():
+    """
+    本地 SQLite 库（已按 setup.sql 建表），只用于直接写库准备数据、再校验的离线用例，与被测服务无关
+    """
+    helper = DatabaseHelper.sqlite(settings.db_sqlite_file, pool_config=settings.db_pool_config)
+    yield helper
+    helper.close()
+
+
+@pytest.fixture(scope="session")
+def entity_registry(db_helper):
+    if db_helper is None or not db_cleanup_enabled():
+        yield None
+        return
+
+    registry = EntityRegistry(db_helper)
+    yield registry
+    registry.flush()
+
+
+@pytest.fixture(scope="function")
+def db_isolation(db_helper):
+    """
+    用例内通过 db_helper 写入的数据在用例结束时整体回滚
+    """
+    if db_helper is None:
+        yield None
+        return
+
+    with db_helper.isolated():
+        yield db_helper
 
 
 @pytest.fixture(scope="function")
-def test_user(auth_api):
+def test_user(auth_api, entity_registry):
     user_data = data_generator.generate_user_data()
     response = auth_api.register(user_data)
     
     if response.status_code == 201:
         user_info = response.json()
+        user_info.setdefault('password', user_data['password'])
         log.info(f"创建测试用户成功: {user_info.get('username')}")
+        if entity_registry is not None:
+            entity_registry.track('users', user_info['id'])
         yield user_info
     else:
         log.error(f"创建测试用户失败: {response.text}")
         yield None
 
 
+def _login_as(auth_api, user_info):
+    if not user_info:
+        return None
+    response = auth_api.login(user_info['username'], user_info['password'])
+    if response.status_code != 200:
+        log.error(f"用户登录失败: {response.text}")
+        return None
+    body = response.json()
+    if not body.get('token'):
+        return None
+    log.info(f"用户登录成功，获取token: {body['token'][:20]}...")
+    return TokenLease(
+        slot=-1,
+        user_id=user_info.get('id'),
+        username=user_info['username'],
+        password=user_info['password'],
+        token=body['token'],
+        refresh_token=body.get('refresh_token'),
+        expires_at=time.time() + float(body.get('expires_in') or 7200),
+    )
+
+
 @pytest.fixture(scope="function")
-def login_token(auth_api, test_user):
-    if not test_user:
-        yield None
+def login_lease(request, auth_api):
+    """
+    从登录态池租用一个池内用户的 token；用例同时使用 test_user 时改为登录该用户，token 与 test_user 属于同一账号
+    用例中登出、改密等使 token 失效时需设置 login_lease.invalidated = True，归还时丢弃该 token
+    """
+    # 录制/回放时也不使用池: 池内用户只在首个租用它的用例中注册、登录，录制的请求序列会随执行顺序变化
+    if cassette_library.enabled or 'test_user' in request.fixturenames:
+        yield _login_as(auth_api, request.getfixturevalue('test_user'))
         return
-    
-    response = auth_api.login(test_user['username'], test_user['password'])
-    
-    if response.status_code == 200:
-        token = response.json().get('token')
-        log.info(f"用户登录成功，获取token: {token[:20]}...")
-        yield token
-    else:
-        log.error(f"用户登录失败: {response.text}")
+
+    lease = token_pool.lease(auth_api)
+    if lease is None:
+        log.error("从登录态池获取token失败")
         yield None
+        return
+
+    log.info(f"租用登录态: {lease.username}, token: {lease.token[:20]}...")
+    yield lease
+    report = getattr(request.node, 'rep_call', None)
+    # 失败的用例可能已让 token 失效（如登出后断言失败），丢弃后下次租用重新登录
+    token_pool.release(lease, discard=lease.invalidated or (report is not None and report.failed))
 
 
 @pytest.fixture(scope="function")
-def test_coupon(coupon_api):
+def login_token(login_lease):
+    yield login_lease.token if login_lease else None
+
+
+def _entity_pool(request, name, fixture_name, api, create, delete, table, registry):
+    if cassette_library.enabled or not entity_pool_enabled():
+        return None
+    config = settings.entity_pool_config
+    demand = getattr(request.config, 'entity_demand', {}).get(fixture_name, 0)
+    pool = EntityPool(
+        name,
+        api,
+        create=create,
+        delete=delete,
+        expected=expected_per_worker(demand),
+        batch_size=int(config.get('batch_size', 20)),
+        max_workers=int(config.get('max_workers', 8)),
+        table=table,
+        registry=registry,
+    )
+    pool.prefill()
+    return pool
+
+
+@pytest.fixture(scope="session")
+def coupon_pool(request, coupon_api, entity_registry):
+    def create_coupon():
+        return coupon_api.create_coupon(data_generator.generate_coupon_data())
+
+    pool = _entity_pool(request, "卡券", "test_coupon", coupon_api, create_coupon, coupon_api.delete_coupon, 'coupons', entity_registry)
+    yield pool
+    if pool is not None:
+        pool.cleanup()
+
+
+@pytest.fixture(scope="session")
+def activity_pool(request, activity_api, entity_registry):
+    def create_activity():
+        return activity_api.create_activity(data_generator.generate_activity_data())
+
+    pool = _entity_pool(request, "活动", "test_activity", activity_api, create_activity, activity_api.delete_activity, 'activities', entity_registry)
+    yield pool
+    if pool is not None:
+        pool.cleanup()
+
+
+@pytest.fixture(scope="function")
+def test_coupon(coupon_api, coupon_pool, entity_registry):
+    if coupon_pool is not None:
+        coupon_info = coupon_pool.lease()
+        if coupon_info:
+            log.info(f"租用测试卡券: {coupon_info.get('id')}")
+        else:
+            log.error("测试卡券池创建卡券失败")
+        yield coupon_info
+        return
+
     coupon_data = data_generator.generate_coupon_data()
     response = coupon_api.create_coupon(coupon_data)
     
@@ -92,6 +254,9 @@ def test_coupon(coupon_api):
         log.info(f"创建测试卡券成功: {coupon_info.get('id')}")
         yield coupon_info
         
+        if entity_registry is not None:
+            entity_registry.track('coupons', coupon_info['id'])
+            return
         coupon_api.delete_coupon(coupon_info['id'])
         log.info(f"清理测试卡券: {coupon_info['id']}")
     else:
@@ -100,7 +265,16 @@ def test_coupon(coupon_api):
 
 
 @pytest.fixture(scope="function")
-def test_activity(activity_api):
+def test_activity(activity_api, activity_pool, entity_registry):
+    if activity_pool is not None:
+        activity_info = activity_pool.lease()
+        if activity_info:
+            log.info(f"租用测试活动: {activity_info.get('id')}")
+        else:
+            log.error("测试活动池创建活动失败")
+        yield activity_info
+        return
+
     activity_data = data_generator.generate_activity_data()
     response = activity_api.create_activity(activity_data)
     
@@ -109,6 +283,9 @@ def test_activity(activity_api):
         log.info(f"创建测试活动成功: {activity_info.get('id')}")
         yield activity_info
         
+        if entity_registry is not None:
+            entity_registry.track('activities', activity_info['id'])
+            return
         activity_api.delete_activity(activity_info['id'])
         log.info(f"清理测试活动: {activity_info['id']}")
     else:
@@ -120,7 +297,11 @@ def test_activity(activity_api):
 def pytest_runtest_makereport(item, call):
     outcome = yield
     rep = outcome.get_result()
-    
+    setattr(item, f"rep_{rep.when}", rep)
+
+    if rep.failed:
+        http_log_policy.flush_pending()
+
     if rep.when == "call" and rep.failed:
         log.error(f"测试用例失败: {item.nodeid}")
         
@@ -132,7 +313,60 @@ def pytest_runtest_makereport(item, call):
             )
 
 
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    http_log_policy.start_test()
+    cassette_library.start(item.nodeid)
+    if cassette_library.current is not None:
+        data_generator.seed(cassette_library.current.seed)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    yield
+    cassette_library.stop()
+
+
 def pytest_collection_modifyitems(items):
     for item in items:
         item.name = item.name.encode("utf-8").decode("unicode_escape")
         item._nodeid = item.nodeid.encode("utf-8").decode("unicode_escape")
+
+
+def pytest_collection_finish(session):
+    session.config.entity_demand = {
+        name: sum(1 for item in session.items if name in getattr(item, 'fixturenames', ()))
+        for name in ('test_coupon', 'test_activity')
+    }
+
+
+def pytest_sessionfinish(session):
+    worker_output = getattr(session.config, 'workeroutput', None)
+    if worker_output is not None:
+        worker_output['latency_histograms'] = latency_recorder.to_dict()
+        worker_output['cassettes'] = cassette_library.recorded
+        logger_manager.complete()
+        return
+
+    if latency_recorder.histograms:
+        path = latency_recorder.dump(settings.reports_dir / 'latency_summary.json')
+        log.info(f"接口耗时统计已输出: {path}")
+        # 回放和挡板的耗时不反映真实后端，既不参与比较也不写入基线历史
+        live_backend = cassette_library.mode != 'replay' and not _stub_server_enabled()
+        if live_backend and latency_baseline.check(latency_recorder) and latency_baseline.mode == 'fail':
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+    cassette_library.update_index(cassette_library.recorded)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    histograms = getattr(node, 'workeroutput', {}).get('latency_histograms')
+    if histograms:
+        latency_recorder.merge_dict(histograms)
+
+    # 全部 worker 退出后才合并日志，避免漏掉仍在写入的记录
+    config = node.config
+    config.workers_down = getattr(config, 'workers_down', 0) + 1
+    if config.workers_down == len(config.getoption('tx') or ()):
+        logger_manager.merge_worker_logs()
+    cassette_library.recorded.update(getattr(node, 'workeroutput', {}).get('cassettes') or {})
@@ -1,5 +1,8 @@
+import asyncio
 import pytest
 import allure
+from api.coupon_api import AsyncCouponAPI
+from core.cassette import cassette_library
 from utils.data_generator import data_generator
 from core.assertion import EnhancedAssertion
 
@@ -58,3 +61,29 @@ class TestCreateCoupon:
         response = coupon_api.create_coupon(coupon_data)
         
         EnhancedAssertion.assert_response_code(response, 400)
+    
+    @allure.title("异步接口创建并查询卡券")
+    @pytest.mark.smoke
+    @pytest.mark.coupon
+    def test_create_coupon_async(self, coupon_api):
+        if cassette_library.mode == 'replay':
+            pytest.skip("异步客户端不支持录制回放")
+        coupon_data = data_generator.generate_coupon_data()
+        
+        async def create_and_query():
+            async_api = AsyncCouponAPI()
+            try:
+                created = await async_api.create_coupon(coupon_data)
+                detail = await async_api.get_coupon_detail(created.json()['id']) if created.status_code == 201 else None
+                return created, detail
+            finally:
+                await async_api.close()
+        
+        created, detail = asyncio.run(create_and_query())
+        
+        EnhancedAssertion.assert_response_code(created, 201)
+        try:
+            EnhancedAssertion.assert_response_code(detail, 200)
+            EnhancedAssertion.assert_field_value(detail, "name", coupon_data['name'])
+        finally:
+            coupon_api.delete_coupon(created.json()['id'])
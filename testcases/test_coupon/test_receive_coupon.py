@@ -1,6 +1,13 @@
 import pytest
 import allure
+from api.coupon_api import CouponAPI
+from config.settings import settings
 from core.assertion import EnhancedAssertion
+from core.cassette import cassette_library
+from core.http_client import HttpClient
+from core.load import BurstHarness
+from core.response_cache import ResponseCache
+from utils.data_generator import data_generator
 
 
 @allure.feature("卡券模块")
@@ -57,3 +64,66 @@ class TestReceiveCoupon:
     @pytest.mark.coupon
     def test_receive_coupon_out_of_stock(self, coupon_api):
         pytest.skip("需要模拟库存不足场景")
+    
+    @allure.title("开启响应缓存时批量领取后库存及时刷新")
+    @pytest.mark.normal
+    @pytest.mark.coupon
+    def test_batch_receive_refreshes_cached_stock(self, test_coupon, test_user):
+        if not test_coupon or not test_user:
+            pytest.skip("测试卡券或用户创建失败")
+        if cassette_library.mode == 'replay':
+            pytest.skip("回放的响应不经过响应缓存")
+        
+        # 显式配置足够长的TTL，结果不受环境配置和两次查询间隔影响
+        cache = ResponseCache({"/api/v1/coupons/{id}/stock": 600})
+        cached_api = CouponAPI(client=HttpClient(base_url=settings.base_url, timeout=settings.timeout, cache=cache))
+        try:
+            with allure.step("查询库存并写入缓存"):
+                response = cached_api.get_coupon_stock(test_coupon['id'])
+                EnhancedAssertion.assert_response_code(response, 200)
+                stock_before = response.json()['available_stock']
+                assert getattr(cached_api.get_coupon_stock(test_coupon['id']), 'cache_status', None) == 'hit'
+            
+            with allure.step("批量领取卡券"):
+                response = cached_api.batch_receive_coupons([test_coupon['id']], test_user['id'])
+                EnhancedAssertion.assert_response_code(response, 200)
+            
+            with allure.step("验证库存不是缓存的旧值"):
+                response = cached_api.get_coupon_stock(test_coupon['id'])
+                assert getattr(response, 'cache_status', None) != 'hit'
+                EnhancedAssertion.assert_field_value(response, "available_stock", stock_before - 1)
+        finally:
+            cached_api.client.close()
+    
+    @allure.title("并发抢券不超发")
+    @pytest.mark.high
+    @pytest.mark.coupon
+    def test_receive_coupon_concurrent_burst(self, coupon_api, db_helper):
+        stock, concurrency = 10, 30
+        coupon_data = data_generator.generate_coupon_data()
+        coupon_data.update(total_stock=stock, available_stock=stock)
+        response = coupon_api.create_coupon(coupon_data)
+        if response.status_code != 201:
+            pytest.skip("测试卡券创建失败")
+        coupon_id = response.json()['id']
+        
+        try:
+            with allure.step(f"{concurrency} 个用户同时领取库存为 {stock} 的卡券"):
+                harness = BurstHarness(CouponAPI, warmup=lambda api: api.get_coupon_stock(coupon_id))
+                report = harness.fire('receive_coupon', [(coupon_id, 30000 + i) for i in range(concurrency)])
+                allure.attach(str(report.summary()), "并发结果", allure.attachment_type.TEXT)
+            
+            with allure.step("验证领取结果"):
+                assert not [r.error for r in report.results if not r.ok], f"并发请求异常: {report.summary()}"
+                assert len(report.succeeded(200)) == stock, f"领取成功数与库存不符: {report.status_counts()}"
+                rejected = [r for r in report.results if r.status_code != 200]
+                assert all(r.status_code >= 400 for r in rejected), f"库存不足时应拒绝领取: {report.status_counts()}"
+                assert not report.duplicates('coupon_code'), f"卡券码重复: {report.duplicates('coupon_code')}"
+                EnhancedAssertion.assert_field_value(coupon_api.get_coupon_stock(coupon_id), "available_stock", 0)
+            
+            if db_helper:
+                with allure.step("校验数据库库存与领取记录"):
+                    violations = db_helper.check_coupon_invariants(coupon_id, initial_stock=stock)
+                    assert not violations, "\n".join(violations)
+        finally:
+            coupon_api.delete_coupon(coupon_id)